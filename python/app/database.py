@@ -3,6 +3,8 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from pathlib import Path
 import os
+from app.utils.metrics import instrument_engine
+from app.utils.query_log import query_log
 
 # Get the database URL from environment variable or use default
 DATABASE_URL = os.getenv(
@@ -10,13 +12,23 @@ DATABASE_URL = os.getenv(
     f"sqlite+aiosqlite:///{Path(__file__).parent.parent}/data/antemortem.db"
 )
 
+# Log every statement, very noisy. Slow statements are logged regardless,
+# see app.utils.query_log.
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "0") == "1"
+
+# An in-memory database only exists on its one connection, so share it.
+# File databases get a connection per session: sessions sharing one
+# connection would commit or roll back each other's work.
+engine_options = {"poolclass": StaticPool} if ":memory:" in DATABASE_URL else {}
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-    echo=True  # Set to False in production
+    echo=DATABASE_ECHO,
+    **engine_options
 )
+instrument_engine(engine, on_statement=query_log.record)
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -36,8 +48,34 @@ async def get_db():
 async def init_db():
     """Initialize the database with tables"""
     from app.models.database import Base
+    if engine.url.get_backend_name() == "sqlite" and engine.url.database not in (None, "", ":memory:"):
+        Path(engine.url.database).parent.mkdir(parents=True, exist_ok=True)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all skips existing tables, so add columns and indexes declared since
+        await conn.run_sync(add_missing_columns, Base.metadata)
+        await conn.run_sync(create_missing_indexes, Base.metadata)
+
+def add_missing_columns(connection, metadata):
+    """Add declared columns that an existing table does not have yet"""
+    # Only works for columns that are nullable or have a server default
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(connection)
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}{default}'))
+
+def create_missing_indexes(connection, metadata):
+    """Create declared indexes that an existing database does not have yet"""
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
 
 async def close_db():
     """Close database connections"""
@@ -1,10 +1,28 @@
-from fastapi import FastAPI, WebSocket
-from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
+from app.utils.startup_timing import startup_timer, PRELOAD_HEAVY_MODULES
+
 from pathlib import Path
+import json
 import logging
 import sys
 
+# Packages whose import cost is broken down in the startup timing report
+TRACKED_PACKAGES = {
+    "app", "fastapi", "starlette", "pydantic", "uvicorn", "sqlalchemy",
+    "aiosqlite", "cv2", "numpy", "reportlab", "PIL"
+}
+
+with startup_timer.track_imports(TRACKED_PACKAGES):
+    from fastapi import FastAPI, WebSocket, Response
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel, ValidationError
+    from typing import Literal
+    import uvicorn
+    from app.utils.connection_manager import ConnectionManager
+    from app.utils.event_broker import EVENT_BROKER_SOCKET, BrokerClient
+    from app.utils.events import event_bus
+    from app.utils.metrics import MetricsMiddleware, registry, CONTENT_TYPE
+    from app.utils.profiling import RequestProfilingMiddleware
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,49 +49,146 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+# Per-route latency and in-flight request metrics
+app.add_middleware(MetricsMiddleware)
+
+# Admin-only cProfile of single requests, triggered by the X-Profile header
+app.add_middleware(RequestProfilingMiddleware)
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+# WebSocket connection manager
+manager = ConnectionManager()
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+# app.serve sets EVENT_BROKER_SOCKET for its workers, which then share
+# change events and /ws broadcasts through the broker
+broker_client = BrokerClient(EVENT_BROKER_SOCKET) if EVENT_BROKER_SOCKET else None
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+@app.on_event("startup")
+async def on_startup():
+    if broker_client is None:
+        # Create tables and add columns declared since, app.serve does this
+        # once before it starts its workers
+        from app.database import init_db
+        with startup_timer.phase("database", kind="init"):
+            await init_db()
+    else:
+        await broker_client.start(on_event=event_bus.deliver, on_broadcast=manager.broadcast)
+        event_bus.relay = broker_client.publish
+    startup_timer.mark_ready()
+    if PRELOAD_HEAVY_MODULES:
+        # Import OpenCV and numpy in the background once the server is ready
+        startup_timer.warm_up_in_background(["numpy", "cv2"])
 
-manager = ConnectionManager()
+@app.on_event("shutdown")
+async def on_shutdown():
+    if broker_client is not None:
+        event_bus.relay = None
+        await broker_client.close()
 
 @app.get("/")
 async def root():
     """Root endpoint to verify API is running"""
     return {"message": "Antemortem Inspection API is running"}
 
+@app.get("/startup-timing")
+async def startup_timing():
+    """Break down startup time by imported module and init step"""
+    return startup_timer.report()
+
+@app.get("/metrics")
+async def metrics():
+    """Expose metrics in Prometheus text format"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+class SubscriptionRequest(BaseModel):
+    action: Literal["subscribe", "unsubscribe"]
+    topics: list[str] = []
+    inspection_id: int | None = None
+    since: int | None = None
+
+async def handle_subscription_message(websocket: WebSocket, message: dict, subscriptions: dict):
+    """Apply a subscribe or unsubscribe request from a /ws client"""
+    async def send(payload: dict):
+        await manager.send(websocket, payload)
+
+    try:
+        request = SubscriptionRequest.model_validate(message)
+    except ValidationError as e:
+        # Reject the frame but keep the connection and any current subscription
+        await send({
+            "type": "error",
+            "detail": [{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()]
+        })
+        return
+
+    previous = subscriptions.pop(websocket, None)
+    if previous is not None:
+        event_bus.unsubscribe(previous)
+
+    if request.action != "subscribe":
+        return
+
+    subscription = event_bus.subscribe(
+        send,
+        topics=set(request.topics),
+        inspection_id=request.inspection_id
+    )
+    subscriptions[websocket] = subscription
+    await send({"type": "subscribed", "last_seq": event_bus.seq})
+
+    # Resume from the last sequence number the client saw
+    if request.since is not None:
+        missed = event_bus.replay(subscription, request.since)
+        if missed is None:
+            await send({"type": "resync_required", "last_seq": event_bus.seq})
+        elif missed:
+            await send({
+                "type": "events",
+                "events": [event.to_dict() for event in missed],
+                "last_seq": missed[-1].seq
+            })
+
+event_subscriptions = {}
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time communication"""
+    """WebSocket endpoint for change event subscriptions and broadcasts"""
     await manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_text()
-            await manager.broadcast(f"Message text was: {data}")
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+
+            if isinstance(message, dict) and message.get("action") in ("subscribe", "unsubscribe"):
+                await handle_subscription_message(websocket, message, event_subscriptions)
+            else:
+                text = f"Message text was: {data}"
+                if broker_client is not None:
+                    # Reaches clients of every worker, this one included
+                    broker_client.broadcast(text)
+                else:
+                    await manager.broadcast(text)
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        subscription = event_subscriptions.pop(websocket, None)
+        if subscription is not None:
+            event_bus.unsubscribe(subscription)
         manager.disconnect(websocket)
 
 try:
     # Import and include routers
-    from app.routers import inspection, camera, detection
+    with startup_timer.track_imports(TRACKED_PACKAGES):
+        from app.routers import inspection, camera, detection, reports, admin, images
 
     app.include_router(inspection.router, prefix="/api/inspection", tags=["inspection"])
     app.include_router(camera.router, prefix="/api/camera", tags=["camera"])
     app.include_router(detection.router, prefix="/api/detection", tags=["detection"])
+    app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+    app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+    app.include_router(images.router, prefix="/api/images", tags=["images"])
 except ImportError as e:
     logger.warning(f"Could not import routers: {e}")
     logger.info("Starting with basic endpoints only")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,6 +14,8 @@ class Inspection(Base):
     animal_id = Column(String, index=True)
     status = Column(String)  # e.g., "completed", "in_progress", "cancelled"
     notes = Column(String, nullable=True)
+    # Bumped on every change to the inspection or its detections, used for ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     detections = relationship("Detection", back_populates="inspection")
@@ -23,7 +25,8 @@ class Detection(Base):
     __tablename__ = "detections"
 
     id = Column(Integer, primary_key=True, index=True)
-    inspection_id = Column(Integer, ForeignKey("inspections.id"))
+    inspection_id = Column(Integer, ForeignKey("inspections.id"), index=True)
+    image_id = Column(Integer, ForeignKey("images.id"), nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     lesion_type = Column(String)
     confidence_score = Column(Float)
@@ -37,13 +40,20 @@ class Detection(Base):
 
 class Image(Base):
     __tablename__ = "images"
+    # A unique index rather than a constraint, so init_db can add it to existing tables
+    __table_args__ = (
+        Index("ux_images_inspection_content", "inspection_id", "content_hash", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    inspection_id = Column(Integer, ForeignKey("inspections.id"))
+    inspection_id = Column(Integer, ForeignKey("inspections.id"), index=True)
     file_path = Column(String)
+    # SHA-256 of the content, the key of the file in the image store
+    content_hash = Column(String(64), nullable=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     camera_id = Column(String)
-    metadata = Column(JSON, nullable=True)  # Stores camera settings, resolution, etc.
+    # "metadata" is reserved by the declarative API, so map it under another name
+    image_metadata = Column("metadata", JSON, nullable=True)  # Stores camera settings, resolution, etc.
     
     # Relationships
     inspection = relationship("Inspection", back_populates="images")
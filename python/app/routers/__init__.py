@@ -5,5 +5,8 @@ FastAPI routers for the Antemortem Inspection Application
 from . import inspection
 from . import camera
 from . import detection
+from . import reports
+from . import admin
+from . import images
 
-__all__ = ['inspection', 'camera', 'detection'] 
\ No newline at end of file
+__all__ = ['inspection', 'camera', 'detection', 'reports', 'admin', 'images'] 
\ No newline at end of file
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel
+from ..utils.admin_auth import require_admin
+from ..utils.query_log import query_log
+from ..utils.profiling import (
+    SAMPLING_INTERVAL, SAMPLING_MAX_DURATION, format_stats, profile_store, sampling_profiler
+)
+
+# Every admin endpoint requires the X-Admin-Token header
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+class ProfilerStart(BaseModel):
+    interval: float = SAMPLING_INTERVAL
+    all_threads: bool = False
+    max_duration: float = SAMPLING_MAX_DURATION
+
+class ProfilerStatus(BaseModel):
+    running: bool
+    interval: float
+    all_threads: bool
+    started_at: float | None = None
+    stopped_at: float | None = None
+    samples: int
+    stacks: int
+
+class ProfileInfo(BaseModel):
+    id: str
+    method: str
+    path: str
+    query_string: str
+    duration: float
+    created_at: float
+
+@router.get("/profiles", response_model=list[ProfileInfo])
+async def list_profiles():
+    """List stored request profiles, newest first"""
+    return profile_store.list()
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "text"):
+    """Return a stored request profile as a text report or a .prof file"""
+    path = profile_store.path_for(profile_id)
+    if profile_store.get(profile_id) is None or not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+    if format == "pstats":
+        return FileResponse(path, filename=path.name, media_type="application/octet-stream")
+    if format != "text":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be 'text' or 'pstats'"
+        )
+    return PlainTextResponse(format_stats(path))
+
+@router.get("/profiler", response_model=ProfilerStatus)
+async def get_profiler_status():
+    """Status of the sampling profiler"""
+    return sampling_profiler.status()
+
+@router.post("/profiler/start", response_model=ProfilerStatus)
+async def start_profiler(settings: ProfilerStart = ProfilerStart()):
+    """Start sampling the event loop thread, or every thread"""
+    if settings.interval < 0.001:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="interval must be at least 0.001 seconds"
+        )
+    try:
+        sampling_profiler.start(settings.interval, settings.all_threads, settings.max_duration)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return sampling_profiler.status()
+
+@router.post("/profiler/stop", response_model=ProfilerStatus)
+async def stop_profiler():
+    """Stop the sampling profiler, keeping its samples"""
+    sampling_profiler.stop()
+    return sampling_profiler.status()
+
+@router.get("/profiler/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_stacks():
+    """Sampled stacks in collapsed format for flamegraph.pl or speedscope"""
+    return sampling_profiler.collapsed()
+
+@router.get("/queries")
+async def get_query_stats(limit: int = 50, order_by: str = "total"):
+    """Aggregated timings per normalized SQL statement, most expensive first"""
+    if order_by not in ("total", "max", "count", "mean"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="order_by must be one of total, max, count, mean"
+        )
+    return {
+        "threshold_ms": query_log.threshold * 1000,
+        "statements": query_log.top(limit, order_by)
+    }
+
+@router.get("/queries/slow")
+async def get_slow_queries():
+    """Most recent statements over the slow-query threshold, newest first"""
+    return list(reversed(query_log.slow_queries))
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_query_stats():
+    """Clear the aggregated statement stats and the slow-query history"""
+    query_log.reset()
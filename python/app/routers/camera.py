@@ -1,11 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-import cv2
-import numpy as np
 from ..database import get_db
-from ..models.database import CameraConfig
+from ..models.database import CameraConfig, Inspection
+from ..utils.events import event_bus
+from ..utils.metrics import CAMERA_FRAMES, CAMERA_FPS, CAMERA_DROPPED_FRAMES, CAMERA_ENCODE_DURATION, FpsMeter
+from ..utils.frame_bus import FRAME_BUS_POLL_INTERVAL, FRAME_BUS_SOCKET, FRAME_BUS_TIMEOUT, CaptureClient, open_camera
+from ..utils.image_store import image_store
+from .images import ImageResponse, image_response, save_image_record
 from pydantic import BaseModel
+import asyncio
+import logging
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -71,6 +81,10 @@ async def configure_camera(
     
     await db.commit()
     await db.refresh(camera)
+    event_bus.publish(
+        "camera.configured",
+        CameraResponse.model_validate(camera).model_dump(mode="json")
+    )
     return camera
 
 @router.delete("/{camera_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -93,32 +107,79 @@ async def remove_camera(
     
     camera.is_active = False
     await db.commit()
+    event_bus.publish("camera.removed", {"id": camera.id, "camera_id": camera_id})
+
+class CameraMetrics:
+    """Metric children for one camera, bound once so frames skip label lookups"""
+
+    def __init__(self, camera_id: str):
+        self.frames = CAMERA_FRAMES.labels(camera_id)
+        self.dropped = CAMERA_DROPPED_FRAMES.labels(camera_id)
+        self.encode = CAMERA_ENCODE_DURATION.labels(camera_id)
+        self.fps = FpsMeter(CAMERA_FPS.labels(camera_id))
 
 class CameraManager:
-    def __init__(self):
+    """Cameras being streamed, keyed by camera id"""
+
+    def __init__(self, frame_bus: CaptureClient | None = None):
         self.active_cameras = {}
+        self.camera_metrics = {}
+        # Set in multi-worker deployments, where the capture process owns the devices
+        self.frame_bus = frame_bus
+        # Per camera, the number of the last frame each reading task got
+        self._cursors = {}
+        # Per camera, the latest frame number and its JPEG, encoded once for all readers
+        self._encoded = {}
+        # Streams and captures using each camera, it is stopped once none are left
+        self.viewers: dict[str, int] = {}
+        # Keeps a release and a new acquire of the same camera from interleaving
+        self._bus_lock = asyncio.Lock()
 
     async def start_camera(self, camera_id: str, settings: dict):
-        """Start a camera capture"""
-        if camera_id in self.active_cameras:
-            return
-        
-        # Parse resolution
-        width, height = map(int, settings["resolution"].split("x"))
-        
-        # Initialize camera
-        cap = cv2.VideoCapture(int(camera_id))
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        cap.set(cv2.CAP_PROP_FPS, settings["framerate"])
-        
-        self.active_cameras[camera_id] = cap
+        """Start a camera capture, or join one another viewer started"""
+        async with self._bus_lock:
+            if camera_id not in self.active_cameras:
+                if self.frame_bus is None:
+                    self.active_cameras[camera_id] = open_camera(camera_id, settings)
+                else:
+                    try:
+                        ring = await self.frame_bus.acquire(camera_id, settings)
+                    except (OSError, RuntimeError) as e:
+                        logger.error(f"Could not start camera {camera_id} on the frame bus: {e}")
+                        raise HTTPException(
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Failed to start camera"
+                        )
+                    self.active_cameras[camera_id] = ring
+                    self._cursors[camera_id] = weakref.WeakKeyDictionary()
+                self.camera_metrics[camera_id] = CameraMetrics(camera_id)
+            self.viewers[camera_id] = self.viewers.get(camera_id, 0) + 1
 
     async def stop_camera(self, camera_id: str):
-        """Stop a camera capture"""
-        if camera_id in self.active_cameras:
-            self.active_cameras[camera_id].release()
-            del self.active_cameras[camera_id]
+        """Leave a camera capture, stopping it once no viewers are left"""
+        async with self._bus_lock:
+            if camera_id not in self.viewers:
+                return
+            self.viewers[camera_id] -= 1
+            if self.viewers[camera_id] > 0:
+                return
+            await self._release(camera_id)
+
+    async def _release(self, camera_id: str):
+        del self.viewers[camera_id]
+        camera = self.active_cameras.pop(camera_id)
+        self.camera_metrics.pop(camera_id).fps.gauge.set(0)
+        if self.frame_bus is None:
+            camera.release()
+            return
+
+        camera.close()
+        self._cursors.pop(camera_id, None)
+        self._encoded.pop(camera_id, None)
+        try:
+            await self.frame_bus.release(camera_id)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Could not release camera {camera_id} on the frame bus: {e}")
 
     async def get_frame(self, camera_id: str) -> bytes:
         """Get a frame from the camera"""
@@ -127,21 +188,86 @@ class CameraManager:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Camera not active"
             )
+        if self.frame_bus is not None:
+            return await self._get_bus_frame(camera_id)
         
         cap = self.active_cameras[camera_id]
+        metrics = self.camera_metrics[camera_id]
         ret, frame = cap.read()
         
         if not ret:
+            metrics.dropped.inc()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to capture frame"
             )
         
         # Convert frame to JPEG
+        import cv2
+        start = time.perf_counter()
         _, buffer = cv2.imencode('.jpg', frame)
+        now = time.perf_counter()
+        metrics.encode.observe(now - start)
+        metrics.frames.inc()
+        metrics.fps.tick(now)
         return buffer.tobytes()
 
-camera_manager = CameraManager()
+    async def _get_bus_frame(self, camera_id: str) -> bytes:
+        """Next frame from the camera's shared-memory ring, encoded once for all readers"""
+        import cv2
+
+        metrics = self.camera_metrics[camera_id]
+        cursors = self._cursors[camera_id]
+        task = asyncio.current_task()
+        after = cursors.get(task, 0)
+        deadline = time.monotonic() + FRAME_BUS_TIMEOUT
+        while True:
+            ring = self.active_cameras.get(camera_id)
+            if ring is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Camera not active"
+                )
+
+            number, jpeg = self._encoded.get(camera_id, (0, None))
+            if number > after and number == ring.latest:
+                break
+
+            start = time.perf_counter()
+            result = ring.read(lambda frame: cv2.imencode('.jpg', frame)[1].tobytes(), after=after)
+            if result is not None:
+                number, _, jpeg = result
+                metrics.encode.observe(time.perf_counter() - start)
+                self._encoded[camera_id] = (number, jpeg)
+                break
+            if time.monotonic() >= deadline:
+                metrics.dropped.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to capture frame"
+                )
+            await asyncio.sleep(FRAME_BUS_POLL_INTERVAL)
+
+        cursors[task] = number
+        metrics.frames.inc()
+        metrics.fps.tick(time.perf_counter())
+        return jpeg
+
+    async def close(self):
+        """Stop every camera, releasing them on the frame bus"""
+        async with self._bus_lock:
+            for camera_id in list(self.viewers):
+                await self._release(camera_id)
+        if self.frame_bus is not None:
+            await self.frame_bus.close()
+
+# app.serve sets FRAME_BUS_SOCKET for its workers, which then share the
+# cameras of the capture process
+camera_manager = CameraManager(CaptureClient(FRAME_BUS_SOCKET) if FRAME_BUS_SOCKET else None)
+
+@router.on_event("shutdown")
+async def stop_cameras():
+    await camera_manager.close()
 
 @router.websocket("/stream/{camera_id}")
 async def stream_camera(
@@ -150,7 +276,10 @@ async def stream_camera(
     db: AsyncSession = Depends(get_db)
 ):
     """Stream camera feed over WebSocket"""
+    from sqlalchemy import select
+
     await websocket.accept()
+    started = False
     
     try:
         # Get camera settings
@@ -164,17 +293,54 @@ async def stream_camera(
         
         # Start camera
         await camera_manager.start_camera(camera_id, camera.settings)
+        started = True
         
         while True:
             try:
                 frame = await camera_manager.get_frame(camera_id)
                 await websocket.send_bytes(frame)
             except Exception as e:
-                print(f"Error streaming frame: {e}")
+                logger.error(f"Error streaming frame from camera {camera_id}: {e}")
                 break
     
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.error(f"Camera {camera_id} WebSocket error: {e}")
+    finally:
+        if started:
+            await camera_manager.stop_camera(camera_id)
+        await websocket.close()
+
+@router.post("/{camera_id}/capture", response_model=ImageResponse)
+async def capture_image(
+    camera_id: str,
+    inspection_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Capture a frame from a camera into the image store for an inspection"""
+    from sqlalchemy import select
+
+    inspection = await db.get(Inspection, inspection_id)
+    if inspection is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inspection not found"
+        )
+
+    query = select(CameraConfig).where(CameraConfig.camera_id == camera_id, CameraConfig.is_active == True)
+    camera = (await db.execute(query)).scalar_one_or_none()
+    if camera is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Camera not found"
+        )
+
+    # Joins a running stream's capture, or opens the camera just for this frame
+    await camera_manager.start_camera(camera_id, camera.settings)
+    try:
+        frame = await camera_manager.get_frame(camera_id)
     finally:
         await camera_manager.stop_camera(camera_id)
-        await websocket.close() 
\ No newline at end of file
+
+    stored = await run_in_threadpool(image_store.write_bytes, frame)
+    image = await save_image_record(db, inspection_id, stored, camera_id=camera_id, metadata=camera.settings)
+    return image_response(image)
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-import cv2
-import numpy as np
 from datetime import datetime
 from ..database import get_db
 from ..models.database import Detection, Inspection
-from pydantic import BaseModel
+from ..utils.events import event_bus
+from ..utils.http_cache import make_etag, conditional_response
+from ..utils.serialization import negotiate_format, encode_rows, media_type_for
+from ..utils.metrics import DETECTION_REQUESTS_IN_PROGRESS, DETECTION_INFERENCE_DURATION
+from pydantic import BaseModel, TypeAdapter
+import time
 
 router = APIRouter()
 
@@ -39,6 +42,21 @@ class DetectionSettings(BaseModel):
     max_detection_size: int = 200
     processing_interval: int = 100
 
+detection_list_adapter = TypeAdapter(List[DetectionResponse])
+
+# Columns selected by the Core fast path, in DetectionResponse field order
+DETECTION_FIELDS = list(DetectionResponse.model_fields)
+
+async def touch_inspection(db: AsyncSession, inspection_id: int):
+    """Bump the inspection's row version when one of its detections changes"""
+    from sqlalchemy import update
+
+    await db.execute(
+        update(Inspection)
+        .where(Inspection.id == inspection_id)
+        .values(version=Inspection.version + 1)
+    )
+
 @router.post("/process", response_model=List[DetectionResponse])
 async def process_image(
     inspection_id: int,
@@ -55,50 +73,82 @@ async def process_image(
             detail="Inspection not found"
         )
 
-    # Read and process image
-    contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    DETECTION_REQUESTS_IN_PROGRESS.inc()
+    try:
+        # OpenCV and numpy are loaded on first use to keep startup fast
+        import cv2
+        import numpy as np
 
-    if img is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid image format"
+        # Read and process image
+        contents = await file.read()
+        start = time.perf_counter()
+        nparr = np.frombuffer(contents, np.uint8)
+        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+        if img is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid image format"
+            )
+
+        # TODO: Implement actual detection logic using TensorFlow/Keras model
+        # For now, return dummy detection
+        dummy_detection = Detection(
+            inspection_id=inspection_id,
+            lesion_type="sample_lesion",
+            confidence_score=0.85,
+            location_data={
+                "x": 100,
+                "y": 100,
+                "width": 50,
+                "height": 50
+            },
+            verified=False
         )
+        DETECTION_INFERENCE_DURATION.observe(time.perf_counter() - start)
+    finally:
+        DETECTION_REQUESTS_IN_PROGRESS.dec()
 
-    # TODO: Implement actual detection logic using TensorFlow/Keras model
-    # For now, return dummy detection
-    dummy_detection = Detection(
-        inspection_id=inspection_id,
-        lesion_type="sample_lesion",
-        confidence_score=0.85,
-        location_data={
-            "x": 100,
-            "y": 100,
-            "width": 50,
-            "height": 50
-        },
-        verified=False
-    )
-    
     db.add(dummy_detection)
+    inspection.version = Inspection.version + 1
     await db.commit()
     await db.refresh(dummy_detection)
+    event_bus.publish(
+        "detection.created",
+        DetectionResponse.model_validate(dummy_detection).model_dump(mode="json"),
+        inspection_id=inspection_id
+    )
     
     return [dummy_detection]
 
 @router.get("/inspection/{inspection_id}", response_model=List[DetectionResponse])
 async def list_detections(
     inspection_id: int,
+    fast: bool = False,
+    if_none_match: str | None = Header(None),
+    accept: str | None = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all detections for a specific inspection"""
+    """List all detections for a specific inspection, as Core rows when fast or MessagePack is requested"""
     from sqlalchemy import select
-    
-    query = select(Detection).where(Detection.inspection_id == inspection_id)
-    result = await db.execute(query)
-    detections = result.scalars().all()
-    return list(detections)
+
+    # Every detection change bumps the inspection's version
+    version = await db.scalar(select(Inspection.version).where(Inspection.id == inspection_id))
+    response_format = negotiate_format(accept, fast)
+
+    async def render() -> bytes:
+        if response_format != "json":
+            columns = [Detection.__table__.c[field] for field in DETECTION_FIELDS]
+            result = await db.execute(select(*columns).where(Detection.inspection_id == inspection_id))
+            return encode_rows(DETECTION_FIELDS, result, response_format)
+
+        query = select(Detection).where(Detection.inspection_id == inspection_id)
+        result = await db.execute(query)
+        detections = detection_list_adapter.validate_python(result.scalars().all(), from_attributes=True)
+        return detection_list_adapter.dump_json(detections)
+
+    etag = make_etag(f"detections-{inspection_id}-v{version or 0}-{response_format}")
+    return await conditional_response(etag, if_none_match, render, media_type_for(response_format))
 
 @router.put("/{detection_id}", response_model=DetectionResponse)
 async def verify_detection(
@@ -116,9 +166,15 @@ async def verify_detection(
     
     detection.verified = update.verified
     detection.verified_by = update.verified_by
+    await touch_inspection(db, detection.inspection_id)
     
     await db.commit()
     await db.refresh(detection)
+    event_bus.publish(
+        "detection.verified",
+        DetectionResponse.model_validate(detection).model_dump(mode="json"),
+        inspection_id=detection.inspection_id
+    )
     return detection
 
 @router.delete("/{detection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -134,5 +190,8 @@ async def delete_detection(
             detail="Detection not found"
         )
     
+    inspection_id = detection.inspection_id
     await db.delete(detection)
-    await db.commit() 
\ No newline at end of file
+    await touch_inspection(db, inspection_id)
+    await db.commit()
+    event_bus.publish("detection.deleted", {"id": detection_id}, inspection_id=inspection_id) 
\ No newline at end of file
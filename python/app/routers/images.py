@@ -0,0 +1,158 @@
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from datetime import datetime
+from ..database import get_db
+from ..models.database import Image, Inspection
+from ..utils.events import event_bus
+from ..utils.http_cache import make_etag, etag_matches, not_modified, conditional_response
+from ..utils.image_store import image_store, ImageStoreError, StoredImage
+from pydantic import BaseModel, TypeAdapter
+import hashlib
+
+router = APIRouter()
+
+# Stored images never change, so browsers may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class ImageResponse(BaseModel):
+    id: int
+    inspection_id: int
+    content_hash: str | None = None
+    camera_id: str | None = None
+    timestamp: datetime
+    url: str | None = None
+    thumbnail_url: str | None = None
+
+    class Config:
+        from_attributes = True
+
+image_list_adapter = TypeAdapter(List[ImageResponse])
+
+def image_response(image: Image) -> ImageResponse:
+    response = ImageResponse.model_validate(image)
+    if image.content_hash:
+        response.url = f"/api/images/{image.content_hash}"
+        response.thumbnail_url = f"/api/images/{image.content_hash}?size=thumb"
+    return response
+
+async def save_image_record(
+    db: AsyncSession,
+    inspection_id: int,
+    stored: StoredImage,
+    camera_id: str | None = None,
+    metadata: dict | None = None
+) -> Image:
+    """Record a stored image against an inspection, once per inspection and content"""
+    from sqlalchemy import select
+
+    query = select(Image).where(
+        Image.inspection_id == inspection_id,
+        Image.content_hash == stored.content_hash
+    )
+    image = (await db.execute(query)).scalars().first()
+    if image is not None:
+        return image
+
+    image = Image(
+        inspection_id=inspection_id,
+        file_path=str(stored.path),
+        content_hash=stored.content_hash,
+        camera_id=camera_id,
+        image_metadata={"media_type": stored.media_type, "size": stored.size, **(metadata or {})}
+    )
+    db.add(image)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same content recorded it first
+        await db.rollback()
+        return (await db.execute(query)).scalars().one()
+    await db.refresh(image)
+    event_bus.publish(
+        "image.created",
+        image_response(image).model_dump(mode="json"),
+        inspection_id=inspection_id
+    )
+    return image
+
+@router.post("/upload", response_model=ImageResponse)
+async def upload_image(
+    inspection_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload an image for an inspection, returning the existing record for a repeat upload"""
+    inspection = await db.get(Inspection, inspection_id)
+    if inspection is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inspection not found"
+        )
+
+    try:
+        stored = await run_in_threadpool(image_store.write_file, file.file)
+    except ImageStoreError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    image = await save_image_record(db, inspection_id, stored, metadata={"filename": file.filename})
+    return image_response(image)
+
+@router.get("/inspection/{inspection_id}", response_model=List[ImageResponse])
+async def list_inspection_images(
+    inspection_id: int,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """List an inspection's images with their full-size and thumbnail URLs"""
+    from sqlalchemy import select
+
+    query = select(Image).where(Image.inspection_id == inspection_id).order_by(Image.id)
+    images = (await db.execute(query)).scalars().all()
+
+    # Image records are never edited, their ids and hashes identify the list
+    digest = hashlib.sha1(repr([(image.id, image.content_hash) for image in images]).encode()).hexdigest()
+
+    async def render() -> bytes:
+        return image_list_adapter.dump_json([image_response(image) for image in images])
+
+    etag = make_etag(f"images-{inspection_id}-{digest}")
+    return await conditional_response(etag, if_none_match, render)
+
+@router.api_route("/{content_hash}", methods=["GET", "HEAD"])
+async def get_image(content_hash: str, request: Request, size: str | None = None):
+    """Serve a stored image or one of its derived sizes, HEAD checks if content is stored"""
+    if not image_store.exists(content_hash):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    if size is not None and size not in image_store.variants:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"size must be one of {', '.join(image_store.variants)}"
+        )
+
+    etag = make_etag(content_hash if size is None else f"{content_hash}-{size}")
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, headers)
+
+    if size is None:
+        path = image_store.path_for(content_hash)
+        media_type = await run_in_threadpool(image_store.media_type_of, content_hash)
+    else:
+        try:
+            path = await image_store.variant_path(content_hash, size)
+        except OSError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Image cannot be resized"
+            )
+        media_type = "image/jpeg"
+
+    # FileResponse answers Range requests and HEAD itself
+    return FileResponse(path, media_type=media_type, headers={**headers, "ETag": etag})
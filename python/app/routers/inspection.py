@@ -1,18 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 from ..database import get_db
 from ..models.database import Inspection
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from fastapi.responses import FileResponse
-from pathlib import Path
-from ..utils.pdf_generator import PDFGenerator
-import json
-import os
+import hashlib
+from ..utils.report_jobs import report_cache, report_jobs
+from ..utils.report_data import load_inspection_data, collect_month_data
+from ..utils.http_cache import make_etag, etag_matches, not_modified, conditional_response
+from ..utils.events import event_bus
+from ..utils.serialization import negotiate_format, encode_rows, media_type_for
 
 router = APIRouter()
-pdf_generator = PDFGenerator()
 
 class InspectionCreate(BaseModel):
     inspector_id: str
@@ -34,6 +35,11 @@ class InspectionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+inspection_list_adapter = TypeAdapter(List[InspectionResponse])
+
+# Columns selected by the Core fast path, in InspectionResponse field order
+INSPECTION_FIELDS = list(InspectionResponse.model_fields)
+
 @router.post("/", response_model=InspectionResponse)
 async def create_inspection(
     inspection: InspectionCreate,
@@ -49,21 +55,36 @@ async def create_inspection(
     db.add(db_inspection)
     await db.commit()
     await db.refresh(db_inspection)
+    event_bus.publish(
+        "inspection.created",
+        InspectionResponse.model_validate(db_inspection).model_dump(mode="json"),
+        inspection_id=db_inspection.id
+    )
     return db_inspection
 
 @router.get("/{inspection_id}", response_model=InspectionResponse)
 async def get_inspection(
     inspection_id: int,
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific inspection by ID"""
-    result = await db.get(Inspection, inspection_id)
-    if result is None:
+    from sqlalchemy import select
+
+    # Only the row version is needed to answer a conditional request
+    version = await db.scalar(select(Inspection.version).where(Inspection.id == inspection_id))
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Inspection not found"
         )
-    return result
+
+    async def render() -> bytes:
+        result = await db.get(Inspection, inspection_id)
+        return InspectionResponse.model_validate(result).model_dump_json().encode()
+
+    etag = make_etag(f"inspection-{inspection_id}-v{version}")
+    return await conditional_response(etag, if_none_match, render)
 
 @router.put("/{inspection_id}", response_model=InspectionResponse)
 async def update_inspection(
@@ -79,60 +100,97 @@ async def update_inspection(
             detail="Inspection not found"
         )
     
+    status_changed = inspection.status is not None and inspection.status != db_inspection.status
     if inspection.status is not None:
         db_inspection.status = inspection.status
     if inspection.notes is not None:
         db_inspection.notes = inspection.notes
+    db_inspection.version = Inspection.version + 1
     
     await db.commit()
     await db.refresh(db_inspection)
+    event_bus.publish(
+        "inspection.status_changed" if status_changed else "inspection.updated",
+        InspectionResponse.model_validate(db_inspection).model_dump(mode="json"),
+        inspection_id=inspection_id
+    )
     return db_inspection
 
 @router.get("/", response_model=List[InspectionResponse])
 async def list_inspections(
     skip: int = 0,
     limit: int = 10,
+    fast: bool = False,
+    if_none_match: str | None = Header(None),
+    accept: str | None = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all inspections with pagination"""
+    """List all inspections with pagination, as Core rows when fast or MessagePack is requested"""
     from sqlalchemy import select
-    
-    query = select(Inspection).offset(skip).limit(limit)
-    result = await db.execute(query)
-    inspections = result.scalars().all()
-    return list(inspections)
+
+    # The page's ids and row versions identify its content
+    versions_query = select(Inspection.id, Inspection.version).order_by(Inspection.id).offset(skip).limit(limit)
+    versions = (await db.execute(versions_query)).all()
+    digest = hashlib.sha1(repr([tuple(row) for row in versions]).encode()).hexdigest()
+
+    response_format = negotiate_format(accept, fast)
+
+    async def render() -> bytes:
+        if response_format != "json":
+            columns = [Inspection.__table__.c[field] for field in INSPECTION_FIELDS]
+            query = select(*columns).order_by(Inspection.id).offset(skip).limit(limit)
+            return encode_rows(INSPECTION_FIELDS, await db.execute(query), response_format)
+
+        query = select(Inspection).order_by(Inspection.id).offset(skip).limit(limit)
+        result = await db.execute(query)
+        inspections = inspection_list_adapter.validate_python(result.scalars().all(), from_attributes=True)
+        return inspection_list_adapter.dump_json(inspections)
+
+    etag = make_etag(f"inspections-{skip}-{limit}-{digest}-{response_format}")
+    return await conditional_response(etag, if_none_match, render, media_type_for(response_format))
 
 @router.get("/report/{inspection_id}")
-async def get_inspection_report(inspection_id: str):
+async def get_inspection_report(
+    inspection_id: str,
+    if_none_match: str | None = Header(None)
+):
     """Generate and return a PDF report for a specific inspection"""
     try:
         # Get inspection data from storage
-        inspection_file = Path(f"data/inspections/inspection_{inspection_id}.json")
-        if not inspection_file.exists():
+        inspection_data = load_inspection_data(inspection_id)
+        if inspection_data is None:
             raise HTTPException(status_code=404, detail="Inspection not found")
 
-        with open(inspection_file, 'r') as f:
-            inspection_data = json.load(f)
-
-        # Create reports directory if it doesn't exist
-        reports_dir = Path("data/reports")
-        reports_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate PDF
-        pdf_path = reports_dir / f"inspection_report_{inspection_id}.pdf"
-        pdf_generator.generate_inspection_report(inspection_data, str(pdf_path))
+        # Serve the cached PDF when the inspection data has not changed
+        etag = make_etag(report_cache.key_for(inspection_data))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        # Render in the report worker pool so other requests keep flowing
+        filename = f"inspection_report_{inspection_id}.pdf"
+        job = await report_jobs.render(
+            "inspection",
+            f"inspection_report_{inspection_id}",
+            inspection_data,
+            filename
+        )
 
         # Return the PDF file
         return FileResponse(
-            path=pdf_path,
-            filename=f"inspection_report_{inspection_id}.pdf",
-            media_type="application/pdf"
+            path=job.path,
+            filename=filename,
+            media_type="application/pdf",
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/monthly-report/{year}/{month}")
-async def get_monthly_report(year: int, month: int):
+async def get_monthly_report(
+    year: int,
+    month: int,
+    if_none_match: str | None = Header(None)
+):
     """Generate and return a PDF report for a specific month"""
     try:
         # Validate month
@@ -140,55 +198,28 @@ async def get_monthly_report(year: int, month: int):
             raise HTTPException(status_code=400, detail="Invalid month")
 
         # Get all inspections for the month
-        inspections_dir = Path("data/inspections")
-        month_data = {
-            'month': f"{year}-{month:02d}",
-            'total_inspections': 0,
-            'passed_inspections': 0,
-            'failed_inspections': 0,
-            'pending_actions': 0,
-            'inspections': []
-        }
-
-        # Collect inspection data for the month
-        if inspections_dir.exists():
-            for file in inspections_dir.glob("inspection_*.json"):
-                with open(file, 'r') as f:
-                    inspection = json.load(f)
-                    inspection_date = datetime.strptime(inspection['date'], '%Y-%m-%d')
-                    
-                    if inspection_date.year == year and inspection_date.month == month:
-                        month_data['total_inspections'] += 1
-                        if inspection['health_status'] == 'Passed':
-                            month_data['passed_inspections'] += 1
-                        elif inspection['health_status'] == 'Failed':
-                            month_data['failed_inspections'] += 1
-                        if inspection.get('pending_actions', False):
-                            month_data['pending_actions'] += 1
-                        
-                        month_data['inspections'].append({
-                            'date': inspection['date'],
-                            'id': inspection['id'],
-                            'animal_type': inspection['animal_type'],
-                            'status': inspection['health_status']
-                        })
-
-        # Sort inspections by date
-        month_data['inspections'].sort(key=lambda x: x['date'])
-
-        # Create reports directory if it doesn't exist
-        reports_dir = Path("data/reports")
-        reports_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate PDF
-        pdf_path = reports_dir / f"monthly_report_{year}_{month:02d}.pdf"
-        pdf_generator.generate_monthly_report(month_data, str(pdf_path))
+        month_data = collect_month_data(year, month)
+
+        # Serve the cached PDF when no inspection in the month has changed
+        etag = make_etag(report_cache.key_for(month_data))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        # Render in the report worker pool so other requests keep flowing
+        filename = f"monthly_report_{year}_{month:02d}.pdf"
+        job = await report_jobs.render(
+            "monthly",
+            f"monthly_report_{year}_{month:02d}",
+            month_data,
+            filename
+        )
 
         # Return the PDF file
         return FileResponse(
-            path=pdf_path,
-            filename=f"monthly_report_{year}_{month:02d}.pdf",
-            media_type="application/pdf"
+            path=job.path,
+            filename=filename,
+            media_type="application/pdf",
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,189 @@
+from fastapi import APIRouter, HTTPException, status, WebSocket
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from pydantic import BaseModel
+from datetime import date
+import asyncio
+import zipfile
+from ..utils.report_jobs import report_jobs, ReportJob
+from ..utils.report_data import load_inspection_data, collect_month_data, find_inspections_in_range
+from ..utils.startup_timing import PRELOAD_HEAVY_MODULES
+from ..utils.zip_stream import ZipStreamBuffer, write_file_entry
+
+router = APIRouter()
+
+class ReportJobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    filename: str
+    error: str | None = None
+    created_at: float
+    finished_at: float | None = None
+
+def _get_job(job_id: str) -> ReportJob:
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job
+
+@router.post("/jobs/inspection/{inspection_id}", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_inspection_report(inspection_id: str):
+    """Queue a PDF report for a specific inspection"""
+    inspection_data = load_inspection_data(inspection_id)
+    if inspection_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inspection not found"
+        )
+
+    job = report_jobs.submit(
+        "inspection",
+        f"inspection_report_{inspection_id}",
+        inspection_data,
+        f"inspection_report_{inspection_id}.pdf"
+    )
+    return job.to_dict()
+
+@router.post("/jobs/monthly/{year}/{month}", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_monthly_report(year: int, month: int):
+    """Queue a PDF report for a specific month"""
+    if month < 1 or month > 12:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid month"
+        )
+
+    job = report_jobs.submit(
+        "monthly",
+        f"monthly_report_{year}_{month:02d}",
+        collect_month_data(year, month),
+        f"monthly_report_{year}_{month:02d}.pdf"
+    )
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(job_id: str):
+    """Get the status of a report job"""
+    return _get_job(job_id).to_dict()
+
+@router.get("/jobs/{job_id}/download")
+async def download_report(job_id: str):
+    """Download the PDF produced by a completed report job"""
+    job = _get_job(job_id)
+
+    if job.status == "failed":
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=job.error
+        )
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Report is not ready yet"
+        )
+    # Marks the report as in use so no worker evicts it while it is sent
+    path = report_jobs.cache.lookup(job.name, job.key)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Report has been evicted, submit it again"
+        )
+
+    return FileResponse(
+        path=path,
+        filename=job.filename,
+        media_type="application/pdf"
+    )
+
+@router.websocket("/jobs/{job_id}/ws")
+async def watch_report_job(websocket: WebSocket, job_id: str):
+    """Send the job status now and again once it has finished"""
+    await websocket.accept()
+
+    job = report_jobs.get(job_id)
+    if job is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.send_json(job.to_dict())
+    if not job.done.is_set():
+        await job.done.wait()
+        await websocket.send_json(job.to_dict())
+    await websocket.close()
+
+@router.get("/bundle")
+async def download_report_bundle(start: date, end: date):
+    """Stream a ZIP of every inspection report dated between start and end"""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date"
+        )
+
+    inspections = find_inspections_in_range(start, end)
+    if not inspections:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No inspections in the requested range"
+        )
+
+    # Queue every report up front, cached ones complete immediately
+    jobs = [
+        report_jobs.submit(
+            "inspection",
+            f"inspection_report_{inspection_id}",
+            inspection_data,
+            f"inspection_report_{inspection_id}.pdf",
+            record=False
+        )
+        for inspection_id, inspection_data in inspections
+    ]
+
+    async def wait_for(job: ReportJob) -> ReportJob:
+        await job.done.wait()
+        return job
+
+    async def stream_bundle():
+        buffer = ZipStreamBuffer()
+        failures = []
+        # Stored rather than deflated, the PDFs' streams are already compressed
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            # Add entries in completion order so the download starts right away
+            for finished in asyncio.as_completed([wait_for(job) for job in jobs]):
+                job = await finished
+                if job.status != "completed":
+                    failures.append(f"{job.filename}: {job.error}")
+                    continue
+                try:
+                    # File reads run in the threadpool, one chunk at a time
+                    async for chunk in iterate_in_threadpool(write_file_entry(archive, buffer, job.path, job.filename)):
+                        if chunk:
+                            yield chunk
+                except FileNotFoundError:
+                    failures.append(f"{job.filename}: evicted before it could be sent")
+
+            if failures:
+                archive.writestr("errors.txt", "\n".join(failures) + "\n")
+        yield buffer.drain()
+
+    return StreamingResponse(
+        stream_bundle(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="inspection_reports_{start}_{end}.zip"'
+        }
+    )
+
+@router.on_event("startup")
+async def start_report_workers():
+    # Spawn the workers and import reportlab there before the first report
+    if PRELOAD_HEAVY_MODULES:
+        report_jobs.warm_up()
+
+@router.on_event("shutdown")
+async def shutdown_report_workers():
+    report_jobs.shutdown()
@@ -0,0 +1,118 @@
+"""Run the API on several worker processes with a capture process and an event broker"""
+from pathlib import Path
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger("app.serve")
+
+
+async def prepare_database():
+    """Create tables once, before the workers start"""
+    from sqlalchemy import text
+    from app.database import engine, init_db
+
+    await init_db()
+    if engine.dialect.name == "sqlite":
+        # WAL keeps readers in one worker from being blocked by a write in another
+        async with engine.connect() as conn:
+            await conn.execute(text("PRAGMA journal_mode=WAL"))
+    await engine.dispose()
+
+
+def start_helper(target, socket_path: Path, name: str) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(
+        target=target,
+        args=(str(socket_path),),
+        name=name,
+        daemon=True
+    )
+    process.start()
+    return process
+
+
+def wait_for_socket(path: Path, process: multiprocessing.Process, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        if not process.is_alive():
+            raise RuntimeError(f"{process.name} exited with code {process.exitcode}")
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"{process.name} did not start within {timeout} seconds")
+        time.sleep(0.05)
+
+
+def watch_helpers(processes: list[multiprocessing.Process]):
+    """Shut the server down when a helper process dies, workers need them all"""
+    def watch():
+        while all(process.is_alive() for process in processes):
+            time.sleep(1)
+        for process in processes:
+            if not process.is_alive():
+                logger.error(f"{process.name} exited with code {process.exitcode}, shutting down")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    threading.Thread(target=watch, name="helper-watch", daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--runtime-dir",
+        help="Directory for the broker and capture sockets, a new temporary directory by default"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    runtime_dir = Path(args.runtime_dir or tempfile.mkdtemp(prefix="antemortem-"))
+    runtime_dir.mkdir(parents=True, exist_ok=True)
+    broker_socket = runtime_dir / "events.sock"
+    capture_socket = runtime_dir / "frames.sock"
+
+    asyncio.run(prepare_database())
+
+    import uvicorn
+    from app.utils.event_broker import run_broker_process
+    from app.utils.frame_bus import run_capture_process
+
+    helpers = [
+        start_helper(run_broker_process, broker_socket, "event-broker"),
+        start_helper(run_capture_process, capture_socket, "capture")
+    ]
+    try:
+        wait_for_socket(broker_socket, helpers[0])
+        wait_for_socket(capture_socket, helpers[1])
+
+        # Read by the workers when they import the app
+        os.environ["EVENT_BROKER_SOCKET"] = str(broker_socket)
+        os.environ["FRAME_BUS_SOCKET"] = str(capture_socket)
+        # Every worker has its own report process pool, share the cores out
+        os.environ.setdefault("REPORT_WORKERS", str(max(1, ((os.cpu_count() or 2) - 1) // args.workers)))
+
+        watch_helpers(helpers)
+        logger.info(f"Starting {args.workers} workers on {args.host}:{args.port}")
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        for process in helpers:
+            if process.is_alive():
+                process.terminate()
+        for process in helpers:
+            process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from fastapi import Header, HTTPException, status
+import hmac
+import os
+
+# Shared secret for admin-only endpoints and diagnostics. Admin features
+# are disabled when it is not set.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def is_admin_token(token: str | None) -> bool:
+    """Check a presented token against ADMIN_TOKEN in constant time"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+async def require_admin(x_admin_token: str | None = Header(None)):
+    """Dependency rejecting requests without a valid X-Admin-Token header"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled, set ADMIN_TOKEN to enable it"
+        )
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
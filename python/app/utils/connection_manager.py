@@ -0,0 +1,115 @@
+from fastapi import WebSocket, status
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Messages buffered per connection before the slow-consumer policy applies
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+# "drop_oldest" discards the oldest queued message, "disconnect" evicts the client
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+# Seconds a single send may take before the connection is considered stalled
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+
+
+class _Connection:
+    """A connected client with its own outbound queue and sender task"""
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.sender: asyncio.Task | None = None
+        self.dropped = 0
+
+
+class ConnectionManager:
+    """Fans messages out to WebSocket clients through a bounded queue per connection"""
+
+    def __init__(
+        self,
+        queue_size: int = WS_SEND_QUEUE_SIZE,
+        policy: str = WS_SLOW_CONSUMER_POLICY,
+        send_timeout: float = WS_SEND_TIMEOUT
+    ):
+        if policy not in ("drop_oldest", "disconnect"):
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.queue_size = queue_size
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.connections: dict[WebSocket, _Connection] = {}
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        connection = _Connection(websocket, self.queue_size)
+        connection.sender = asyncio.get_running_loop().create_task(self._send_loop(connection))
+        self.connections[websocket] = connection
+
+    def disconnect(self, websocket: WebSocket):
+        connection = self.connections.pop(websocket, None)
+        if connection is not None and connection.sender is not None:
+            connection.sender.cancel()
+
+    async def send(self, websocket: WebSocket, message: str | dict):
+        """Queue a message for a single client"""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            self._enqueue(connection, self._serialize(message))
+
+    async def broadcast(self, message: str | dict):
+        """Queue a message for every connected client"""
+        payload = self._serialize(message)
+        for connection in list(self.connections.values()):
+            self._enqueue(connection, payload)
+
+    @staticmethod
+    def _serialize(message: str | dict) -> str:
+        return message if isinstance(message, str) else json.dumps(message)
+
+    def _enqueue(self, connection: _Connection, payload: str):
+        try:
+            connection.queue.put_nowait(payload)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == "drop_oldest":
+            connection.queue.get_nowait()
+            connection.queue.put_nowait(payload)
+            connection.dropped += 1
+        else:
+            logger.warning("Disconnecting slow WebSocket consumer")
+            self._evict(connection)
+
+    def _evict(self, connection: _Connection):
+        self.disconnect(connection.websocket)
+        asyncio.get_running_loop().create_task(self._close(connection.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=status.WS_1013_TRY_AGAIN_LATER),
+                timeout=self.send_timeout
+            )
+        except Exception:
+            pass
+
+    async def _send_loop(self, connection: _Connection):
+        websocket = connection.websocket
+        try:
+            while True:
+                payload = await connection.queue.get()
+                await asyncio.wait_for(websocket.send_text(payload), timeout=self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning("Disconnecting stalled WebSocket consumer")
+            self._evict(connection)
+        except Exception as e:
+            logger.info(f"WebSocket send failed, dropping connection: {e}")
+            self.disconnect(websocket)
@@ -0,0 +1,155 @@
+from collections import deque
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import os
+import time
+from .events import EVENT_HISTORY_SIZE, Event
+from .local_ipc import connect, encode_message, read_message, serve_until_signalled
+
+logger = logging.getLogger(__name__)
+
+# Unix socket of the event broker, set by app.serve for every API worker
+EVENT_BROKER_SOCKET = os.getenv("EVENT_BROKER_SOCKET")
+# Messages a worker can publish while the broker is unreachable
+EVENT_BROKER_BACKLOG = int(os.getenv("EVENT_BROKER_BACKLOG", "1000"))
+# Bytes queued for a worker that stopped reading before it is disconnected
+EVENT_BROKER_MAX_BUFFER = int(os.getenv("EVENT_BROKER_MAX_BUFFER", str(64 * 1024 * 1024)))
+
+
+class EventBroker:
+    """Numbers change events and shares them and /ws broadcasts between API workers"""
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE, max_buffer: int = EVENT_BROKER_MAX_BUFFER):
+        self.seq = 0
+        # Sent to each worker as it connects, so it can resume clients reconnecting with since
+        self.history: deque[bytes] = deque(maxlen=history_size)
+        self.max_buffer = max_buffer
+        self.workers: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    async def handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._handlers.add(asyncio.current_task())
+        for payload in self.history:
+            writer.write(payload)
+        self.workers.add(writer)
+        try:
+            while (message := await read_message(reader)) is not None:
+                self.handle(message)
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Dropping worker connection: {e}")
+        finally:
+            self.workers.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def handle(self, message: dict):
+        op = message.get("op")
+        if op == "publish":
+            self.seq += 1
+            payload = encode_message({
+                "op": "event",
+                "event": {
+                    "seq": self.seq,
+                    "type": message["type"],
+                    "inspection_id": message.get("inspection_id"),
+                    "data": message["data"],
+                    "timestamp": time.time()
+                }
+            })
+            self.history.append(payload)
+        elif op == "broadcast":
+            payload = encode_message({"op": "broadcast", "message": message["message"]})
+        else:
+            logger.warning(f"Ignoring unknown broker message: {op}")
+            return
+
+        for writer in list(self.workers):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                # The worker will reconnect and catch up from the history
+                logger.warning("Disconnecting worker that stopped reading events")
+                self.workers.discard(writer)
+                writer.close()
+                continue
+            writer.write(payload)
+
+    async def close(self):
+        for writer in list(self.workers):
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+
+class BrokerClient:
+    """A worker's connection to the event broker, publishing without waiting"""
+
+    def __init__(self, path: str, backlog: int = EVENT_BROKER_BACKLOG):
+        self.path = path
+        self._backlog: deque[bytes] = deque(maxlen=backlog)
+        self._writer: asyncio.StreamWriter | None = None
+        self._receiver: asyncio.Task | None = None
+        self._on_event: Callable[[Event], None] | None = None
+        self._on_broadcast: Callable[[str], Awaitable[None]] | None = None
+
+    async def start(self, on_event: Callable[[Event], None], on_broadcast: Callable[[str], Awaitable[None]]):
+        """Connect and start handing received events and broadcasts to the callbacks"""
+        self._on_event = on_event
+        self._on_broadcast = on_broadcast
+        reader, self._writer = await connect(self.path)
+        self._receiver = asyncio.get_running_loop().create_task(self._receive_loop(reader))
+
+    def publish(self, event_type: str, data: dict, inspection_id: int | None = None):
+        self._send({"op": "publish", "type": event_type, "data": data, "inspection_id": inspection_id})
+
+    def broadcast(self, message: str):
+        self._send({"op": "broadcast", "message": message})
+
+    def _send(self, message: dict):
+        payload = encode_message(message)
+        # Kept in a bounded backlog while the broker is unreachable
+        if self._writer is None or self._writer.is_closing():
+            self._backlog.append(payload)
+        else:
+            self._writer.write(payload)
+
+    async def _receive_loop(self, reader: asyncio.StreamReader):
+        while True:
+            try:
+                if reader is None:
+                    reader, self._writer = await connect(self.path)
+                    logger.info("Reconnected to the event broker")
+                    while self._backlog:
+                        self._writer.write(self._backlog.popleft())
+
+                message = await read_message(reader)
+                if message is None:
+                    raise ConnectionError("Event broker closed the connection")
+                if message["op"] == "event":
+                    self._on_event(Event.from_dict(message["event"]))
+                elif message["op"] == "broadcast":
+                    await self._on_broadcast(message["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event broker connection failed: {e}")
+                if self._writer is not None:
+                    self._writer.close()
+                reader, self._writer = None, None
+                await asyncio.sleep(1)
+
+    async def close(self):
+        if self._receiver is not None:
+            self._receiver.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def run_broker_process(path: str):
+    """Entry point of the event broker process started by app.serve"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    broker = EventBroker()
+    logger.info(f"Event broker listening on {path}")
+    asyncio.run(serve_until_signalled(broker.handle_worker, path, on_stop=broker.close))
@@ -0,0 +1,159 @@
+from collections import deque
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Number of recent events kept so reconnecting clients can resume
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+# Seconds events are collected before being sent as one coalesced batch
+EVENT_COALESCE_INTERVAL = float(os.getenv("EVENT_COALESCE_INTERVAL", "0.1"))
+
+
+class Event:
+    """A change to an inspection, detection or camera"""
+
+    def __init__(
+        self,
+        seq: int,
+        event_type: str,
+        data: dict,
+        inspection_id: int | None = None,
+        timestamp: float | None = None
+    ):
+        self.seq = seq
+        self.type = event_type  # e.g. "inspection.created", "detection.verified"
+        self.topic = event_type.split(".", 1)[0]
+        self.data = data
+        self.inspection_id = inspection_id
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @classmethod
+    def from_dict(cls, event: dict) -> "Event":
+        return cls(event["seq"], event["type"], event["data"], event.get("inspection_id"), event.get("timestamp"))
+
+    def to_dict(self) -> dict:
+        return {
+            "seq": self.seq,
+            "type": self.type,
+            "inspection_id": self.inspection_id,
+            "data": self.data,
+            "timestamp": self.timestamp
+        }
+
+
+class Subscription:
+    """A client's topic filter and its buffer of not yet delivered events"""
+
+    def __init__(
+        self,
+        send: Callable[[dict], Awaitable[None]],
+        topics: set[str] | None = None,
+        inspection_id: int | None = None,
+        interval: float = EVENT_COALESCE_INTERVAL
+    ):
+        self.send = send
+        self.topics = topics or set()
+        self.inspection_id = inspection_id
+        self.interval = interval
+        self._pending: dict[tuple, Event] = {}
+        self._wakeup = asyncio.Event()
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def matches(self, event: Event) -> bool:
+        if self.topics and event.topic not in self.topics:
+            return False
+        if self.inspection_id is not None and event.inspection_id != self.inspection_id:
+            return False
+        return True
+
+    def push(self, event: Event):
+        # A newer event for the same entity and type replaces the pending one
+        key = (event.type, event.data.get("id", event.seq))
+        self._pending.pop(key, None)
+        self._pending[key] = event
+        self._wakeup.set()
+
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.interval)
+            self._wakeup.clear()
+
+            events = sorted(self._pending.values(), key=lambda event: event.seq)
+            self._pending.clear()
+            if not events:
+                continue
+            try:
+                await self.send({
+                    "type": "events",
+                    "events": [event.to_dict() for event in events],
+                    "last_seq": events[-1].seq
+                })
+            except Exception as e:
+                logger.warning(f"Could not deliver events: {e}")
+
+    def close(self):
+        self._flusher.cancel()
+
+
+class EventBus:
+    """In-process publish/subscribe hub for sequence-numbered change events"""
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE):
+        self.seq = 0
+        self.history: deque[Event] = deque(maxlen=history_size)
+        self.subscriptions: set[Subscription] = set()
+        # Set with several workers: the event broker numbers published events
+        # and hands them back to every worker's deliver
+        self.relay: Callable[[str, dict, int | None], None] | None = None
+
+    def publish(self, event_type: str, data: dict, inspection_id: int | None = None) -> Event | None:
+        if self.relay is not None:
+            self.relay(event_type, data, inspection_id)
+            return None
+        event = Event(self.seq + 1, event_type, data, inspection_id)
+        self.deliver(event)
+        return event
+
+    def deliver(self, event: Event):
+        """Record an event and queue it for matching subscriptions"""
+        if event.seq <= self.seq:
+            # Already seen, e.g. replayed by the broker after a reconnect
+            return
+        self.seq = event.seq
+        self.history.append(event)
+        for subscription in list(self.subscriptions):
+            if subscription.matches(event):
+                subscription.push(event)
+
+    def subscribe(
+        self,
+        send: Callable[[dict], Awaitable[None]],
+        topics: set[str] | None = None,
+        inspection_id: int | None = None
+    ) -> Subscription:
+        subscription = Subscription(send, topics, inspection_id)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+        subscription.close()
+
+    def replay(self, subscription: Subscription, since: int) -> list[Event] | None:
+        """Events after since matching a subscription, or None if some were already dropped"""
+        if since >= self.seq:
+            return []
+        if not self.history or self.history[0].seq > since + 1:
+            return None
+        return [
+            event for event in self.history
+            if event.seq > since and subscription.matches(event)
+        ]
+
+
+event_bus = EventBus()
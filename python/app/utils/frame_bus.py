@@ -0,0 +1,329 @@
+from multiprocessing import shared_memory
+from typing import Any, Callable
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+import uuid
+from .local_ipc import connect, encode_message, read_message, serve_until_signalled
+
+logger = logging.getLogger(__name__)
+
+# Unix socket of the capture process, set by app.serve for every API worker.
+# When set, CameraManager reads frames from the frame bus instead of opening
+# the camera devices itself.
+FRAME_BUS_SOCKET = os.getenv("FRAME_BUS_SOCKET")
+# Frames kept per camera, a reader slower than this many frames gets overtaken
+FRAME_BUS_SLOTS = int(os.getenv("FRAME_BUS_SLOTS", "4"))
+# Seconds a reader waits for a new frame before giving up
+FRAME_BUS_TIMEOUT = float(os.getenv("FRAME_BUS_TIMEOUT", "2"))
+# Seconds between checks for a new frame
+FRAME_BUS_POLL_INTERVAL = float(os.getenv("FRAME_BUS_POLL_INTERVAL", "0.005"))
+
+_MAGIC = b"FBUS"
+# Ring header: magic, slot count, slot capacity in bytes, then at offset 16
+# the number of the latest complete frame
+_HEADER = struct.Struct("<4sII")
+_LATEST = struct.Struct("<Q")
+_LATEST_OFFSET = 16
+_HEADER_SIZE = 64
+# Slot header: seqlock counter, then frame number, timestamp and shape
+_LOCK = struct.Struct("<Q")
+_META = struct.Struct("<QdIII")
+_SLOT_HEADER_SIZE = 64
+# Attempts at reading a frame the writer keeps overtaking
+_READ_ATTEMPTS = 3
+
+
+def open_camera(camera_id: str, settings: dict):
+    """Open a camera device with the configured resolution and framerate"""
+    import cv2
+
+    width, height = map(int, settings["resolution"].split("x"))
+    cap = cv2.VideoCapture(int(camera_id))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, settings["framerate"])
+    return cap
+
+
+class FrameRing:
+    """Raw frames of one camera in a shared-memory ring buffer"""
+
+    # The capture process is the only writer. Each slot is a seqlock: its
+    # counter is odd while a frame is copied in, and readers use the frame in
+    # place, retrying if the counter was odd or changed, so neither side blocks
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        magic, self.slots, self.slot_bytes = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{shm.name} is not a frame ring")
+        self._written = self.latest
+
+    @classmethod
+    def create(cls, slot_bytes: int, slots: int = FRAME_BUS_SLOTS, name: str | None = None) -> "FrameRing":
+        size = _HEADER_SIZE + slots * (_SLOT_HEADER_SIZE + slot_bytes)
+        shm = shared_memory.SharedMemory(name=name or f"frames-{uuid.uuid4().hex[:12]}", create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, slots, slot_bytes)
+        _LATEST.pack_into(shm.buf, _LATEST_OFFSET, 0)
+        for slot in range(slots):
+            _LOCK.pack_into(shm.buf, _HEADER_SIZE + slot * (_SLOT_HEADER_SIZE + slot_bytes), 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        # The processes of app.serve share one resource tracker, which keeps
+        # a single registration per segment, so attaching leaves unlinking
+        # to the capture process
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def latest(self) -> int:
+        """Number of the latest complete frame, 0 before the first"""
+        return _LATEST.unpack_from(self.shm.buf, _LATEST_OFFSET)[0]
+
+    def _slot_offset(self, number: int) -> int:
+        return _HEADER_SIZE + (number % self.slots) * (_SLOT_HEADER_SIZE + self.slot_bytes)
+
+    def write(self, frame, timestamp: float | None = None) -> int:
+        """Copy a uint8 frame into the next slot and return its number"""
+        import numpy as np
+
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit a {self.slot_bytes} byte slot")
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        number = self._written + 1
+        buf = self.shm.buf
+        offset = self._slot_offset(number)
+        lock = _LOCK.unpack_from(buf, offset)[0]
+        _LOCK.pack_into(buf, offset, lock + 1)
+        target = np.ndarray(frame.shape, np.uint8, buffer=buf, offset=offset + _SLOT_HEADER_SIZE)
+        np.copyto(target, frame)
+        del target
+        _META.pack_into(buf, offset + _LOCK.size, number, timestamp or time.time(), height, width, channels)
+        _LOCK.pack_into(buf, offset, lock + 2)
+
+        _LATEST.pack_into(buf, _LATEST_OFFSET, number)
+        self._written = number
+        return number
+
+    def read(self, consume: Callable[[Any], Any], after: int = 0) -> tuple[int, float, Any] | None:
+        """Pass the latest frame newer than after to consume, returning (number, timestamp, result) or None"""
+        # consume gets a view into shared memory that is only valid during
+        # the call, and runs again if the writer overtakes it
+        import numpy as np
+
+        buf = self.shm.buf
+        for _ in range(_READ_ATTEMPTS):
+            latest = self.latest
+            if latest <= after:
+                return None
+            offset = self._slot_offset(latest)
+            lock = _LOCK.unpack_from(buf, offset)[0]
+            if lock & 1:
+                continue
+            number, timestamp, height, width, channels = _META.unpack_from(buf, offset + _LOCK.size)
+            shape = (height, width, channels) if channels > 1 else (height, width)
+            frame = np.ndarray(shape, np.uint8, buffer=buf, offset=offset + _SLOT_HEADER_SIZE)
+            try:
+                result = consume(frame)
+            finally:
+                del frame
+            if _LOCK.unpack_from(buf, offset)[0] == lock:
+                return number, timestamp, result
+        return None
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class _CameraCapture(threading.Thread):
+    """Reads one camera as fast as it delivers and writes frames to its ring"""
+
+    def __init__(self, camera_id: str, cap, ring: FrameRing):
+        super().__init__(name=f"capture-{camera_id}", daemon=True)
+        self.camera_id = camera_id
+        self.cap = cap
+        self.ring = ring
+        self._stopped = threading.Event()
+
+    def run(self):
+        failures = 0
+        while not self._stopped.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                failures += 1
+                if failures == 1 or failures % 100 == 0:
+                    logger.warning(f"Failed to read camera {self.camera_id} ({failures} times)")
+                time.sleep(0.05)
+                continue
+            failures = 0
+            try:
+                self.ring.write(frame)
+            except ValueError as e:
+                logger.warning(f"Dropping frame from camera {self.camera_id}: {e}")
+        self.cap.release()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class CaptureService:
+    """Owns the camera devices and publishes their frames on the frame bus"""
+
+    def __init__(self, slots: int = FRAME_BUS_SLOTS):
+        self.slots = slots
+        self.cameras: dict[str, _CameraCapture] = {}
+        # Workers holding each camera, it is closed once none are left
+        self.holders: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    async def handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        held: set[str] = set()
+        self._connections.add(writer)
+        self._handlers.add(asyncio.current_task())
+        try:
+            while (message := await read_message(reader)) is not None:
+                try:
+                    reply = await self.handle(message, held)
+                except Exception as e:
+                    logger.error(f"Capture request {message.get('op')} failed: {e}")
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(encode_message(reply))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Dropping worker connection: {e}")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            for camera_id in held:
+                await self.release(camera_id)
+            self._handlers.discard(asyncio.current_task())
+
+    async def handle(self, message: dict, held: set[str]) -> dict:
+        camera_id = str(message["camera_id"])
+        if message["op"] == "acquire":
+            if camera_id not in held:
+                await self.acquire(camera_id, message["settings"])
+                held.add(camera_id)
+            return {"ok": True, "name": self.cameras[camera_id].ring.name}
+        if message["op"] == "release":
+            if camera_id in held:
+                held.discard(camera_id)
+                await self.release(camera_id)
+            return {"ok": True}
+        raise ValueError(f"Unknown capture request: {message['op']}")
+
+    async def acquire(self, camera_id: str, settings: dict):
+        async with self._lock:
+            if camera_id not in self.cameras:
+                self.cameras[camera_id] = await asyncio.to_thread(self._start_capture, camera_id, settings)
+            self.holders[camera_id] = self.holders.get(camera_id, 0) + 1
+
+    async def release(self, camera_id: str):
+        async with self._lock:
+            if camera_id not in self.holders:
+                # Already stopped on shutdown
+                return
+            self.holders[camera_id] -= 1
+            if self.holders[camera_id] > 0:
+                return
+            del self.holders[camera_id]
+            capture = self.cameras.pop(camera_id)
+            await asyncio.to_thread(capture.stop)
+            capture.ring.close()
+            logger.info(f"Stopped camera {camera_id}")
+
+    def _start_capture(self, camera_id: str, settings: dict) -> _CameraCapture:
+        cap = open_camera(camera_id, settings)
+        ret, frame = cap.read()
+        if not ret:
+            cap.release()
+            raise RuntimeError(f"Failed to capture frame from camera {camera_id}")
+
+        ring = FrameRing.create(frame.nbytes, self.slots)
+        ring.write(frame)
+        capture = _CameraCapture(camera_id, cap, ring)
+        capture.start()
+        logger.info(f"Started camera {camera_id}: {frame.shape[1]}x{frame.shape[0]} frames in {ring.name}")
+        return capture
+
+    async def close(self):
+        # Closed connections release their cameras as their handlers finish
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        async with self._lock:
+            for capture in self.cameras.values():
+                await asyncio.to_thread(capture.stop)
+                capture.ring.close()
+            self.cameras.clear()
+            self.holders.clear()
+
+
+class CaptureClient:
+    """A worker's connection to the capture process"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def _request(self, message: dict) -> dict:
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    self._reader, self._writer = await connect(self.path)
+                self._writer.write(encode_message(message))
+                await self._writer.drain()
+                reply = await read_message(self._reader)
+                if reply is None:
+                    raise ConnectionError("Capture process closed the connection")
+            except Exception:
+                # Cameras held on a broken connection are released by the
+                # capture process, the next request starts afresh
+                await self.close()
+                raise
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    async def acquire(self, camera_id: str, settings: dict) -> FrameRing:
+        """Start a camera in the capture process, or share it, and attach to its ring"""
+        reply = await self._request({"op": "acquire", "camera_id": camera_id, "settings": settings})
+        return FrameRing.attach(reply["name"])
+
+    async def release(self, camera_id: str):
+        await self._request({"op": "release", "camera_id": camera_id})
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def run_capture_process(path: str):
+    """Entry point of the capture process started by app.serve"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    service = CaptureService()
+    logger.info(f"Capture process listening on {path}")
+    asyncio.run(serve_until_signalled(service.handle_worker, path, on_stop=service.close))
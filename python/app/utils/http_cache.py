@@ -0,0 +1,54 @@
+from fastapi import Response
+from typing import Awaitable, Callable
+from .response_cache import response_cache
+
+
+def make_etag(value: str, weak: bool = False) -> str:
+    """Quote a validator string as an HTTP entity tag"""
+    return f'W/"{value}"' if weak else f'"{value}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an entity tag using weak comparison"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    target = opaque(etag)
+    return any(opaque(candidate) == target for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str, headers: dict | None = None) -> Response:
+    """Build an empty 304 response carrying the current entity tag"""
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, **(headers or {})}
+    )
+
+
+async def conditional_response(
+    etag: str,
+    if_none_match: str | None,
+    render: Callable[[], Awaitable[bytes]],
+    media_type: str = "application/json"
+) -> Response:
+    """Answer a conditional GET, awaiting render only when the body is not cached"""
+    # The entity tag covers the negotiated format, so both answers vary on Accept
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, {"Vary": "Accept"})
+
+    body = response_cache.get(etag)
+    if body is None:
+        body = await render()
+        response_cache.set(etag, body)
+
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    )
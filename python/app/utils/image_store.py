@@ -0,0 +1,174 @@
+from pathlib import Path
+from typing import BinaryIO
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+
+# Root of the content-addressed image store
+IMAGE_STORE_DIR = Path(os.getenv("IMAGE_STORE_DIR", "data/images"))
+# Largest accepted upload
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(25 * 1024 * 1024)))
+# Derived sizes that can be requested, as bounding boxes in pixels
+IMAGE_VARIANTS = {
+    "thumb": (256, 256),
+    # Embedded in PDF reports, 4x3 inch at 150 dpi
+    "report": (600, 450),
+    "medium": (1024, 1024)
+}
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_CONTENT_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ImageStoreError(ValueError):
+    """An upload was rejected by the image store"""
+
+
+def is_content_hash(value: str) -> bool:
+    return bool(_CONTENT_HASH.match(value))
+
+
+def sniff_media_type(header: bytes) -> str | None:
+    """Media type of an image from its first bytes"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if header[:2] == b"BM":
+        return "image/bmp"
+    return None
+
+
+class StoredImage:
+    """An image held in the store"""
+
+    def __init__(self, content_hash: str, path: Path, size: int, media_type: str, created: bool):
+        self.content_hash = content_hash
+        self.path = path
+        self.size = size
+        self.media_type = media_type
+        # False when the content was already stored
+        self.created = created
+
+
+class ImageStore:
+    """Images stored by the SHA-256 of their content, with derived sizes rendered on demand"""
+
+    def __init__(self, root: Path = IMAGE_STORE_DIR, max_bytes: int = IMAGE_MAX_BYTES, variants: dict = IMAGE_VARIANTS):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.variants = variants
+        self._pending_variants: dict[tuple[str, str], asyncio.Task] = {}
+
+    def path_for(self, content_hash: str) -> Path:
+        # Sharded on the first four hex digits so no directory grows too large
+        return self.root / "objects" / content_hash[:2] / content_hash[2:4] / content_hash
+
+    def variant_path_for(self, content_hash: str, variant: str) -> Path:
+        return self.root / "variants" / variant / content_hash[:2] / content_hash[2:4] / f"{content_hash}.jpg"
+
+    def exists(self, content_hash: str) -> bool:
+        return is_content_hash(content_hash) and self.path_for(content_hash).is_file()
+
+    def media_type_of(self, content_hash: str) -> str:
+        with open(self.path_for(content_hash), "rb") as f:
+            return sniff_media_type(f.read(16)) or "application/octet-stream"
+
+    def resolve(self, reference: str) -> str:
+        """Map a content hash to its file path, other references are returned as is"""
+        if is_content_hash(reference):
+            return str(self.path_for(reference))
+        return reference
+
+    def write_file(self, source: BinaryIO) -> StoredImage:
+        """Store an image from a file object, skipping the copy if it is already stored"""
+        header = source.read(16)
+        media_type = sniff_media_type(header)
+        if media_type is None:
+            raise ImageStoreError("Unsupported image format")
+
+        # First pass only hashes, so re-uploads never touch the disk
+        digest = hashlib.sha256(header)
+        size = len(header)
+        while chunk := source.read(HASH_CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise ImageStoreError(f"Image is larger than {self.max_bytes} bytes")
+            digest.update(chunk)
+
+        content_hash = digest.hexdigest()
+        path = self.path_for(content_hash)
+        if path.is_file():
+            return StoredImage(content_hash, path, size, media_type, created=False)
+
+        source.seek(0)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{content_hash}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                while chunk := source.read(HASH_CHUNK_SIZE):
+                    f.write(chunk)
+            # Concurrent writers of the same content produce identical files
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return StoredImage(content_hash, path, size, media_type, created=True)
+
+    def write_bytes(self, data: bytes) -> StoredImage:
+        """Store an image held in memory, such as an encoded camera frame"""
+        import io
+
+        return self.write_file(io.BytesIO(data))
+
+    def variant_file(self, content_hash: str, variant: str) -> Path:
+        """Path of a derived size, rendering it in the calling thread on first use"""
+        path = self.variant_path_for(content_hash, variant)
+        if path.is_file():
+            return path
+        return self._render_variant(content_hash, variant)
+
+    async def variant_path(self, content_hash: str, variant: str) -> Path:
+        """Path of a derived size, rendering it on first use"""
+        path = self.variant_path_for(content_hash, variant)
+        if path.is_file():
+            return path
+
+        # Concurrent requests for the same missing variant share one render
+        key = (content_hash, variant)
+        task = self._pending_variants.get(key)
+        if task is None:
+            loop = asyncio.get_running_loop()
+            task = loop.create_task(asyncio.to_thread(self._render_variant, content_hash, variant))
+            self._pending_variants[key] = task
+            task.add_done_callback(lambda _: self._pending_variants.pop(key, None))
+        return await asyncio.shield(task)
+
+    def _render_variant(self, content_hash: str, variant: str) -> Path:
+        from PIL import Image as PILImage
+
+        size = self.variants[variant]
+        path = self.variant_path_for(content_hash, variant)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with PILImage.open(self.path_for(content_hash)) as img:
+                # Let the JPEG decoder scale down while decoding
+                img.draft("RGB", size)
+                img = img.convert("RGB")
+                img.thumbnail(size)
+                img.save(tmp_path, "JPEG", quality=IMAGE_VARIANT_QUALITY, optimize=True)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return path
+
+
+image_store = ImageStore()
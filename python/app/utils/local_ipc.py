@@ -0,0 +1,63 @@
+from pathlib import Path
+import asyncio
+import json
+import os
+import signal
+
+# Largest message accepted on a local socket
+IPC_MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def encode_message(message: dict) -> bytes:
+    """One newline-terminated JSON message"""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict | None:
+    """Next message from a peer, or None once it has closed the connection"""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+async def start_server(handle, path: str | Path) -> asyncio.AbstractServer:
+    """Listen on a Unix socket only the current user can connect to"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    server = await asyncio.start_unix_server(handle, path=str(path), limit=IPC_MAX_MESSAGE_BYTES)
+    os.chmod(path, 0o600)
+    return server
+
+
+async def connect(path: str | Path, timeout: float = 10.0) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to a Unix socket, waiting for its server to come up"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        try:
+            return await asyncio.open_unix_connection(str(path), limit=IPC_MAX_MESSAGE_BYTES)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if loop.time() >= deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def serve_until_signalled(handle, path: str | Path, on_stop=None):
+    """Serve a Unix socket until SIGTERM, then run on_stop"""
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stopped.set)
+    # Ctrl+C reaches the whole process group, and the workers using this
+    # server must shut down before it does
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    server = await start_server(handle, path)
+    try:
+        await stopped.wait()
+    finally:
+        server.close()
+        if on_stop is not None:
+            await on_stop()
+        Path(path).unlink(missing_ok=True)
@@ -7,8 +7,75 @@ from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import os
 from pathlib import Path
+from .thumbnails import make_report_thumbnails, REPORT_MAX_IMAGES
+from .report_cache import REPORT_TEMPLATE_VERSION
+
+# Monthly reports with more rows than this are rendered in large-report mode
+LARGE_REPORT_ROWS = int(os.getenv("LARGE_REPORT_ROWS", "500"))
+# Rows per inspection list table in large-report mode, about one page
+LARGE_REPORT_CHUNK_ROWS = 30
+
+# Table styles are immutable once built, so every table shares these
+DETAIL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 14),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+INSPECTION_LIST_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+INSPECTION_LIST_HEADER = ['Date', 'ID', 'Animal Type', 'Status']
+INSPECTION_LIST_COL_WIDTHS = [1.5*inch, 1.5*inch, 2*inch, 1*inch]
+
+
+class _StreamedFlowables(list):
+    """Flowable list that is refilled from an iterator as the document is built"""
+
+    def __init__(self, head, source, lookahead=4):
+        super().__init__(head)
+        self._source = iter(source)
+        # doc.build pops flowables off the front, so at most this many are held
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                list.append(self, next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
 
 class PDFGenerator:
+    TEMPLATE_VERSION = REPORT_TEMPLATE_VERSION
+
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.title_style = ParagraphStyle(
@@ -45,19 +112,7 @@ class PDFGenerator:
         ]
 
         table = Table(table_data, colWidths=[2*inch, 4*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(DETAIL_TABLE_STYLE)
         return table
 
     def generate_inspection_report(self, inspection_data, output_path):
@@ -86,11 +141,17 @@ class PDFGenerator:
             elements.append(Spacer(1, 20))
             elements.append(Paragraph("Inspection Images", self.heading_style))
             elements.append(Spacer(1, 12))
-            for img_path in inspection_data['images']:
-                if os.path.exists(img_path):
-                    img = Image(img_path, width=4*inch, height=3*inch)
-                    elements.append(img)
-                    elements.append(Spacer(1, 12))
+            # Embed cached report-resolution copies instead of the originals,
+            # images may be given as paths or image store content hashes
+            images = inspection_data['images'][:REPORT_MAX_IMAGES]
+            for img_path in make_report_thumbnails(images):
+                img = Image(img_path, width=4*inch, height=3*inch, kind='proportional')
+                elements.append(img)
+                elements.append(Spacer(1, 12))
+
+            omitted = len(inspection_data['images']) - len(images)
+            if omitted > 0:
+                elements.append(Paragraph(f"{omitted} more images not shown", self.normal_style))
 
         # Build PDF
         doc.build(elements)
@@ -125,19 +186,7 @@ class PDFGenerator:
         ]
 
         stats_table = Table(stats_data, colWidths=[3*inch, 3*inch])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        stats_table.setStyle(DETAIL_TABLE_STYLE)
         elements.append(stats_table)
         elements.append(Spacer(1, 20))
 
@@ -145,8 +194,22 @@ class PDFGenerator:
         elements.append(Paragraph("Inspection List", self.heading_style))
         elements.append(Spacer(1, 12))
 
-        inspections_data = [['Date', 'ID', 'Animal Type', 'Status']]
-        for inspection in month_data['inspections']:
+        inspections = month_data['inspections']
+        if len(inspections) <= LARGE_REPORT_ROWS:
+            elements.append(self._create_inspection_list_table(inspections))
+
+            # Build PDF
+            doc.build(elements)
+            return
+
+        # Large-report mode: stream the list as page-sized tables so only a
+        # few of them exist at any time while the document is laid out
+        doc.build(_StreamedFlowables(elements, self._iter_inspection_list_chunks(inspections)))
+
+    def _create_inspection_list_table(self, inspections):
+        """Create the inspection list table for a slice of inspections"""
+        inspections_data = [INSPECTION_LIST_HEADER]
+        for inspection in inspections:
             inspections_data.append([
                 inspection['date'],
                 inspection['id'],
@@ -154,21 +217,15 @@ class PDFGenerator:
                 inspection['status']
             ])
 
-        inspections_table = Table(inspections_data, colWidths=[1.5*inch, 1.5*inch, 2*inch, 1*inch])
-        inspections_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(inspections_table)
+        inspections_table = Table(
+            inspections_data,
+            colWidths=INSPECTION_LIST_COL_WIDTHS,
+            repeatRows=1
+        )
+        inspections_table.setStyle(INSPECTION_LIST_TABLE_STYLE)
+        return inspections_table
 
-        # Build PDF
-        doc.build(elements) 
\ No newline at end of file
+    def _iter_inspection_list_chunks(self, inspections):
+        """Yield the inspection list one page-sized table at a time"""
+        for start in range(0, len(inspections), LARGE_REPORT_CHUNK_ROWS):
+            yield self._create_inspection_list_table(inspections[start:start + LARGE_REPORT_CHUNK_ROWS])
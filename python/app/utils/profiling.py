@@ -0,0 +1,270 @@
+from collections import Counter, OrderedDict
+from pathlib import Path
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from . import admin_auth
+
+logger = logging.getLogger(__name__)
+
+# Where per-request profiles are stored and how many are kept
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", "data/profiles"))
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "20"))
+# Rows of the pstats report returned for a profiled request
+PROFILE_REPORT_LIMIT = int(os.getenv("PROFILE_REPORT_LIMIT", "60"))
+
+# Sampling profiler defaults, in seconds
+SAMPLING_INTERVAL = float(os.getenv("SAMPLING_INTERVAL", "0.005"))
+SAMPLING_MAX_DURATION = float(os.getenv("SAMPLING_MAX_DURATION", "300"))
+
+
+def format_stats(profile: cProfile.Profile | str | Path, limit: int = PROFILE_REPORT_LIMIT) -> str:
+    """Render profile stats as text, sorted by cumulative time"""
+    output = io.StringIO()
+    stats = pstats.Stats(str(profile) if isinstance(profile, Path) else profile, stream=output)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles as .prof files"""
+
+    def __init__(self, directory: Path = PROFILES_DIR, max_profiles: int = PROFILE_MAX_STORED):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self.profiles: OrderedDict[str, dict] = OrderedDict()
+
+    def path_for(self, profile_id: str) -> Path:
+        return self.directory / f"{profile_id}.prof"
+
+    def save(self, profile: cProfile.Profile, info: dict, profile_id: str | None = None) -> str:
+        profile_id = profile_id or uuid.uuid4().hex
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(self.path_for(profile_id)))
+        self.profiles[profile_id] = {"id": profile_id, **info}
+
+        while len(self.profiles) > self.max_profiles:
+            expired_id, _ = self.profiles.popitem(last=False)
+            self.path_for(expired_id).unlink(missing_ok=True)
+        return profile_id
+
+    def get(self, profile_id: str) -> dict | None:
+        return self.profiles.get(profile_id)
+
+    def list(self) -> list[dict]:
+        return list(reversed(self.profiles.values()))
+
+
+class RequestProfilingMiddleware:
+    """ASGI middleware profiling admin requests sent with X-Profile: store or return"""
+
+    def __init__(self, app, store: "ProfileStore | None" = None):
+        self.app = app
+        self.store = store or profile_store
+        # cProfile sees everything on the event loop thread, so only one
+        # request is profiled at a time and others get X-Profile-Skipped
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        mode = headers.get(b"x-profile", b"").decode().lower()
+        if mode not in ("store", "return"):
+            await self.app(scope, receive, send)
+            return
+
+        # Without a valid token the header is ignored, not reported
+        if not admin_auth.is_admin_token(headers.get(b"x-admin-token", b"").decode()):
+            await self.app(scope, receive, send)
+            return
+
+        if self._active:
+            await self.app(scope, receive, self._add_headers(send, [(b"x-profile-skipped", b"busy")]))
+            return
+
+        if mode == "return":
+            await self._profile_and_return(scope, receive, send)
+        else:
+            await self._profile_and_store(scope, receive, send)
+
+    @staticmethod
+    def _add_headers(send, extra: list):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + extra}
+            await send(message)
+        return send_wrapper
+
+    async def _run_profiled(self, scope, receive, send) -> tuple[cProfile.Profile, float]:
+        profile = cProfile.Profile()
+        self._active = True
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.disable()
+            self._active = False
+        return profile, time.perf_counter() - start
+
+    async def _profile_and_store(self, scope, receive, send):
+        # The profile id has to be known before the headers go out
+        profile_id = uuid.uuid4().hex
+        started_headers = [(b"x-profile-id", profile_id.encode())]
+        profile, elapsed = await self._run_profiled(scope, receive, self._add_headers(send, started_headers))
+
+        info = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_string": scope.get("query_string", b"").decode(),
+            "duration": round(elapsed, 6),
+            "created_at": time.time()
+        }
+        self.store.save(profile, info, profile_id)
+        logger.info(f"Profiled {scope['method']} {scope['path']} in {elapsed:.3f}s as {profile_id}")
+
+    async def _profile_and_return(self, scope, receive, send):
+        status_code = 500
+
+        async def capture(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profile, elapsed = await self._run_profiled(scope, receive, capture)
+        body = format_stats(profile).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(status_code).encode()),
+                (b"server-timing", f"total;dur={elapsed * 1000:.1f}".encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class SamplingProfiler:
+    """Statistical profiler counting stacks in the collapsed flamegraph format"""
+
+    def __init__(self):
+        self.samples: Counter[str] = Counter()
+        self.interval = SAMPLING_INTERVAL
+        # Only the starting thread by default, the event loop when started
+        # from an endpoint, so time blocking the loop shows up directly
+        self.all_threads = False
+        self.started_at: float | None = None
+        self.stopped_at: float | None = None
+        self.sample_count = 0
+        self._labels = {}
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        # Guards samples between the sampling thread and readers
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = SAMPLING_INTERVAL, all_threads: bool = False, max_duration: float = SAMPLING_MAX_DURATION):
+        """Start sampling, clearing any previous samples"""
+        if self.running:
+            raise RuntimeError("Sampling profiler is already running")
+        with self._lock:
+            self.samples.clear()
+        self.sample_count = 0
+        self.interval = interval
+        self.all_threads = all_threads
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(threading.get_ident(), max_duration),
+            name="sampling-profiler",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            name = getattr(code, "co_qualname", code.co_name)
+            # ';' separates frames and ' ' the count in collapsed output
+            label = f"{module}:{name}:{code.co_firstlineno}".replace(";", ",").replace(" ", "_")
+            self._labels[code] = label
+        return label
+
+    def _stack(self, frame) -> list[str]:
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _run(self, target_ident: int, max_duration: float):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + max_duration
+        thread_names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = []
+            if self.all_threads:
+                if len(thread_names) != threading.active_count():
+                    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in frames.items():
+                    if ident != own_ident:
+                        name = thread_names.get(ident, str(ident)).replace(" ", "_").replace(";", ",")
+                        stacks.append(";".join([name] + self._stack(frame)))
+            elif target_ident in frames:
+                stacks.append(";".join(self._stack(frames[target_ident])))
+            del frames
+
+            with self._lock:
+                for stack in stacks:
+                    self.samples[stack] += 1
+            self.sample_count += 1
+            if time.monotonic() > deadline:
+                logger.info("Sampling profiler reached its maximum duration")
+                break
+        self.stopped_at = time.time()
+
+    def collapsed(self) -> str:
+        """Sampled stacks in collapsed format, one ``stack count`` per line"""
+        with self._lock:
+            counts = self.samples.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in counts)
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "all_threads": self.all_threads,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "samples": self.sample_count,
+            "stacks": len(self.samples)
+        }
+
+
+profile_store = ProfileStore()
+sampling_profiler = SamplingProfiler()
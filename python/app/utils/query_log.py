@@ -0,0 +1,185 @@
+from collections import OrderedDict, deque
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their query plan
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+# Number of distinct normalized statements tracked, later ones share one entry
+QUERY_STATS_MAX_STATEMENTS = int(os.getenv("QUERY_STATS_MAX_STATEMENTS", "500"))
+SLOW_QUERY_HISTORY = int(os.getenv("SLOW_QUERY_HISTORY", "100"))
+
+OTHER_STATEMENTS = "<other statements>"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a statement to its shape, so literals and IN-list sizes share stats"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?, ...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _value_shape(value) -> str:
+    name = type(value).__name__
+    if isinstance(value, (str, bytes)):
+        return f"{name}[{len(value)}]"
+    return name
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """Describe bound parameters by type and length, never by value"""
+    if executemany:
+        if not parameters:
+            return "0 x ()"
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if not parameters:
+        return "()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {_value_shape(value)}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(_value_shape(value) for value in parameters) + ")"
+
+
+class QueryStats:
+    """Aggregated timings for one normalized statement"""
+
+    __slots__ = ("statement", "count", "total", "max", "slow_count", "plan", "full_scan")
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow_count = 0
+        self.plan: list[str] | None = None
+        self.full_scan = False
+
+    def to_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "slow_count": self.slow_count,
+            "plan": self.plan,
+            "full_scan": self.full_scan
+        }
+
+
+class QueryLog:
+    """Per-statement timing stats and a log of slow statements with their query plans"""
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+        max_statements: int = QUERY_STATS_MAX_STATEMENTS,
+        history: int = SLOW_QUERY_HISTORY
+    ):
+        self.threshold = threshold_ms / 1000
+        self.max_statements = max_statements
+        self.stats: OrderedDict[str, QueryStats] = OrderedDict()
+        self.slow_queries = deque(maxlen=history)
+        self._normalized = {}
+
+    def record(self, conn, statement: str, parameters, executemany: bool, elapsed: float):
+        """Add a timed statement, passed in by the engine hook of app.utils.metrics"""
+        stats = self._stats_for(statement)
+        stats.count += 1
+        stats.total += elapsed
+        if elapsed > stats.max:
+            stats.max = elapsed
+
+        if elapsed >= self.threshold:
+            self._record_slow(conn, stats, statement, parameters, executemany, elapsed)
+
+    def _stats_for(self, statement: str) -> QueryStats:
+        normalized = self._normalized.get(statement)
+        if normalized is None:
+            normalized = normalize_statement(statement)
+            if len(self._normalized) < self.max_statements * 4:
+                self._normalized[statement] = normalized
+
+        stats = self.stats.get(normalized)
+        if stats is None:
+            if len(self.stats) >= self.max_statements:
+                normalized = OTHER_STATEMENTS
+                stats = self.stats.get(normalized)
+            if stats is None:
+                stats = self.stats[normalized] = QueryStats(normalized)
+        return stats
+
+    def _record_slow(self, conn, stats: QueryStats, statement: str, parameters, executemany: bool, elapsed: float):
+        stats.slow_count += 1
+        # The plan is captured once per normalized statement
+        if stats.plan is None and stats.statement != OTHER_STATEMENTS:
+            plan_parameters = parameters[0] if executemany and parameters else parameters
+            stats.plan = self.explain(conn, statement, plan_parameters)
+            stats.full_scan = any(_is_full_scan(line) for line in stats.plan or [])
+
+        shape = parameter_shape(parameters, executemany)
+        self.slow_queries.append({
+            "statement": stats.statement,
+            "duration_ms": round(elapsed * 1000, 3),
+            "parameters": shape,
+            "plan": stats.plan,
+            "full_scan": stats.full_scan,
+            "timestamp": time.time()
+        })
+        plan = " | ".join(stats.plan) if stats.plan else "n/a"
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f}ms): {stats.statement} params={shape} plan=[{plan}]"
+            + (" FULL SCAN" if stats.full_scan else "")
+        )
+
+    @staticmethod
+    def explain(conn, statement: str, parameters) -> list[str] | None:
+        """EXPLAIN QUERY PLAN a statement on SQLite, None elsewhere or on failure"""
+        if conn.dialect.name != "sqlite":
+            return None
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+                # Rows are (id, parent, notused, detail)
+                return [row[-1] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.debug(f"Could not explain query: {e}")
+            return None
+
+    def top(self, limit: int = 50, order_by: str = "total") -> list[dict]:
+        """Aggregated stats for the most expensive statements"""
+        key = {
+            "total": lambda stats: stats.total,
+            "max": lambda stats: stats.max,
+            "count": lambda stats: stats.count,
+            "mean": lambda stats: stats.total / stats.count if stats.count else 0.0
+        }[order_by]
+        return [stats.to_dict() for stats in sorted(self.stats.values(), key=key, reverse=True)[:limit]]
+
+    def reset(self):
+        self.stats.clear()
+        self.slow_queries.clear()
+
+
+def _is_full_scan(detail: str) -> bool:
+    # "SCAN detections" is a table scan, "SCAN detections USING INDEX ..." is not
+    return (
+        detail.startswith("SCAN ")
+        and "USING" not in detail
+        and "SUBQUERY" not in detail
+        and "CONSTANT ROW" not in detail
+    )
+
+
+query_log = QueryLog()
@@ -0,0 +1,143 @@
+from pathlib import Path
+from typing import Callable
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from .image_store import is_content_hash
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout rendered by PDFGenerator changes so cached
+# reports are rebuilt. Kept here so the cache key can be computed without
+# importing reportlab.
+REPORT_TEMPLATE_VERSION = "5"
+
+# Upper bound on the total size of cached PDFs in the reports directory
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Seconds after its last use during which a report is never removed, so a
+# response in any worker can open it before another worker deletes it
+REPORT_CACHE_MIN_AGE = int(os.getenv("REPORT_CACHE_MIN_AGE", "60"))
+
+
+def image_versions(data: dict) -> list:
+    """Size and modification time of each image file a report embeds"""
+    versions = []
+    for image in data.get("images") or []:
+        # Image store entries never change, their hash already identifies them
+        if is_content_hash(image):
+            continue
+        try:
+            stat = os.stat(image)
+        except OSError:
+            versions.append([image, None])
+            continue
+        versions.append([image, stat.st_size, stat.st_mtime_ns])
+    return versions
+
+
+class ReportCache:
+    """Generated PDF reports stored as <name>.<key>.pdf, keyed by a hash of their input"""
+
+    def __init__(
+        self,
+        reports_dir: str | Path,
+        template_version: str,
+        max_bytes: int = REPORT_CACHE_MAX_BYTES,
+        min_age: int = REPORT_CACHE_MIN_AGE
+    ):
+        self.reports_dir = Path(reports_dir)
+        self.template_version = template_version
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+
+    def key_for(self, data: dict) -> str:
+        """Hash the report input and its image files together with the template version"""
+        payload = json.dumps(
+            {"template": self.template_version, "data": data, "images": image_versions(data)},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, name: str, key: str) -> Path:
+        """Location of the cached report for a name and content key"""
+        return self.reports_dir / f"{name}.{key[:32]}.pdf"
+
+    def lookup(self, name: str, key: str) -> Path | None:
+        """Return the cached report if present, marking it as recently used"""
+        path = self.path_for(name, key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def temp_path_for(self, name: str, key: str) -> Path:
+        """Scratch location to render into before the report is stored"""
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(name, key)
+        return path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+    def store(self, name: str, key: str, rendered_path: str | Path) -> Path:
+        """Move a freshly rendered report into the cache"""
+        path = self.path_for(name, key)
+        os.replace(rendered_path, path)
+
+        # Older versions of the same report can never be served again
+        self.invalidate(name, keep=path)
+        self.evict(keep=path)
+        return path
+
+    def get_or_render(self, name: str, key: str, render: Callable[[str], None]) -> Path:
+        """Return the cached report, calling ``render(output_path)`` on a miss"""
+        cached = self.lookup(name, key)
+        if cached is not None:
+            return cached
+
+        tmp_path = self.temp_path_for(name, key)
+        try:
+            render(str(tmp_path))
+            return self.store(name, key, tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def invalidate(self, name: str, keep: Path | None = None):
+        """Remove every cached version of a report that is not in use"""
+        pattern = str(self.reports_dir / f"{glob.escape(name)}.*.pdf")
+        cutoff = time.time() - self.min_age
+        for file in glob.glob(pattern):
+            try:
+                if Path(file) == keep or os.stat(file).st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            Path(file).unlink(missing_ok=True)
+
+    def evict(self, keep: Path | None = None):
+        """Delete least recently used reports until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for file in self.reports_dir.glob("*.pdf"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        cutoff = time.time() - self.min_age
+        for mtime, size, file in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes or mtime > cutoff:
+                break
+            if file == keep:
+                continue
+            file.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"Evicted cached report {file.name}")
@@ -0,0 +1,70 @@
+from pathlib import Path
+from datetime import date, datetime
+import json
+
+INSPECTIONS_DIR = Path("data/inspections")
+
+
+def load_inspection_data(inspection_id: str) -> dict | None:
+    """Load the stored data for a single inspection report"""
+    inspection_file = INSPECTIONS_DIR / f"inspection_{inspection_id}.json"
+    if not inspection_file.exists():
+        return None
+
+    with open(inspection_file, 'r') as f:
+        return json.load(f)
+
+
+def collect_month_data(year: int, month: int) -> dict:
+    """Collect summary statistics and the inspection list for a month"""
+    month_data = {
+        'month': f"{year}-{month:02d}",
+        'total_inspections': 0,
+        'passed_inspections': 0,
+        'failed_inspections': 0,
+        'pending_actions': 0,
+        'inspections': []
+    }
+
+    if INSPECTIONS_DIR.exists():
+        for file in INSPECTIONS_DIR.glob("inspection_*.json"):
+            with open(file, 'r') as f:
+                inspection = json.load(f)
+                inspection_date = datetime.strptime(inspection['date'], '%Y-%m-%d')
+
+                if inspection_date.year == year and inspection_date.month == month:
+                    month_data['total_inspections'] += 1
+                    if inspection['health_status'] == 'Passed':
+                        month_data['passed_inspections'] += 1
+                    elif inspection['health_status'] == 'Failed':
+                        month_data['failed_inspections'] += 1
+                    if inspection.get('pending_actions', False):
+                        month_data['pending_actions'] += 1
+
+                    month_data['inspections'].append({
+                        'date': inspection['date'],
+                        'id': inspection['id'],
+                        'animal_type': inspection['animal_type'],
+                        'status': inspection['health_status']
+                    })
+
+    # Sort inspections by date
+    month_data['inspections'].sort(key=lambda x: x['date'])
+    return month_data
+
+
+def find_inspections_in_range(start: date, end: date) -> list[tuple[str, dict]]:
+    """Find stored inspections dated between start and end, inclusive"""
+    found = []
+    if INSPECTIONS_DIR.exists():
+        for file in INSPECTIONS_DIR.glob("inspection_*.json"):
+            with open(file, 'r') as f:
+                inspection = json.load(f)
+            inspection_date = datetime.strptime(inspection['date'], '%Y-%m-%d').date()
+
+            if start <= inspection_date <= end:
+                inspection_id = file.stem[len("inspection_"):]
+                found.append((inspection_id, inspection))
+
+    found.sort(key=lambda item: item[1]['date'])
+    return found
@@ -0,0 +1,196 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from .report_cache import ReportCache, REPORT_TEMPLATE_VERSION
+from .metrics import REPORT_RENDER_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes rendering reports concurrently
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+# Seconds a finished job stays available for status polling and download
+REPORT_JOB_TTL = int(os.getenv("REPORT_JOB_TTL", "3600"))
+
+# PDF generator owned by each worker process
+_worker_generator = None
+
+
+def _get_worker_generator():
+    """PDF generator for the current worker process, created on first use"""
+    global _worker_generator
+    if _worker_generator is None:
+        # reportlab is only ever imported inside the worker processes
+        from .pdf_generator import PDFGenerator
+        _worker_generator = PDFGenerator()
+    return _worker_generator
+
+
+def _render_report(kind: str, data: dict, output_path: str) -> float:
+    """Render a report inside a worker process and return the render time"""
+    generator = _get_worker_generator()
+    start = time.perf_counter()
+
+    if kind == "inspection":
+        generator.generate_inspection_report(data, output_path)
+    elif kind == "monthly":
+        generator.generate_monthly_report(data, output_path)
+    else:
+        raise ValueError(f"Unknown report kind: {kind}")
+    return time.perf_counter() - start
+
+
+def _warm_worker() -> int:
+    """Import reportlab in a worker ahead of the first report"""
+    _get_worker_generator()
+    return os.getpid()
+
+
+class ReportJob:
+    """State of a single report rendering job"""
+
+    def __init__(self, kind: str, name: str, key: str, filename: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.name = name
+        self.key = key
+        self.filename = filename
+        self.status = "queued"  # "queued", "running", "completed", "failed"
+        self.error: str | None = None
+        self.path: Path | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.done = asyncio.Event()
+
+    def finish(self, status: str, path: Path | None = None, error: str | None = None):
+        self.status = status
+        self.path = path
+        self.error = error
+        self.finished_at = time.time()
+        self.done.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "filename": self.filename,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class ReportJobManager:
+    """Renders reports in a process pool, coalescing identical pending jobs"""
+
+    def __init__(self, cache: ReportCache, max_workers: int = REPORT_WORKERS, job_ttl: int = REPORT_JOB_TTL):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.job_ttl = job_ttl
+        # Jobs submitted for later polling, by id
+        self.jobs: dict[str, ReportJob] = {}
+        self._active: dict[tuple[str, str], ReportJob] = {}
+        self._pool: ProcessPoolExecutor | None = None
+        # One slot per pool worker, so a job only counts as running once a worker is free for it
+        self._slots = asyncio.Semaphore(max_workers)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawn rather than fork, the server process runs threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def submit(self, kind: str, name: str, data: dict, filename: str, record: bool = True) -> ReportJob:
+        """Queue a report for rendering, reusing an equivalent pending job"""
+        self._prune()
+        key = self.cache.key_for(data)
+
+        active = self._active.get((name, key))
+        if active is not None:
+            if record:
+                self.jobs[active.id] = active
+            return active
+
+        job = ReportJob(kind, name, key, filename)
+        # Only jobs that will be polled by id are kept, until they expire
+        if record:
+            self.jobs[job.id] = job
+
+        cached = self.cache.lookup(name, key)
+        if cached is not None:
+            job.finish("completed", path=cached)
+            return job
+
+        self._active[(name, key)] = job
+        asyncio.get_running_loop().create_task(self._run(job, data))
+        return job
+
+    async def render(self, kind: str, name: str, data: dict, filename: str) -> ReportJob:
+        """Submit a report and wait until it has been rendered"""
+        job = self.submit(kind, name, data, filename, record=False)
+        await job.done.wait()
+        if job.status == "failed":
+            raise RuntimeError(job.error)
+        return job
+
+    def get(self, job_id: str) -> ReportJob | None:
+        return self.jobs.get(job_id)
+
+    async def _run(self, job: ReportJob, data: dict):
+        tmp_path = self.cache.temp_path_for(job.name, job.key)
+        try:
+            async with self._slots:
+                job.status = "running"
+                elapsed = await self._execute(job, data, tmp_path)
+            REPORT_RENDER_DURATION.labels(job.kind).observe(elapsed)
+            job.finish("completed", path=self.cache.store(job.name, job.key, tmp_path))
+        except Exception as e:
+            logger.error(f"Report job {job.id} ({job.name}) failed: {e}")
+            job.finish("failed", error=str(e))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+            self._active.pop((job.name, job.key), None)
+
+    async def _execute(self, job: ReportJob, data: dict, tmp_path: Path) -> float:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), _render_report, job.kind, data, str(tmp_path))
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool, start a fresh one and retry once
+            logger.warning("Report worker pool broke, restarting it")
+            self._pool = None
+            return await loop.run_in_executor(self._get_pool(), _render_report, job.kind, data, str(tmp_path))
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def warm_up(self):
+        """Start the worker processes in the background before they are needed"""
+        pool = self._get_pool()
+        for _ in range(self.max_workers):
+            pool.submit(_warm_worker)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+report_cache = ReportCache("data/reports", REPORT_TEMPLATE_VERSION)
+report_jobs = ReportJobManager(report_cache)
@@ -0,0 +1,89 @@
+from datetime import date, datetime
+from typing import Any, Iterable, Sequence
+import json
+
+# orjson and msgpack are optional, the fast path falls back to the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+# Media types clients use to ask for MessagePack
+MSGPACK_ACCEPT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode()
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    return msgpack.packb(payload, default=_default, datetime=False)
+
+
+def parse_accept(accept: str) -> dict[str, float]:
+    """Map each media range of an Accept header to its q-value"""
+    ranges = {}
+    for part in accept.split(","):
+        media_range, *params = [item.strip() for item in part.split(";")]
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_range = media_range.lower()
+        ranges[media_range] = max(quality, ranges.get(media_range, 0.0))
+    return ranges
+
+
+def accept_quality(ranges: dict[str, float], media_type: str) -> float:
+    """q-value of a media type under the most specific matching range"""
+    if media_type in ranges:
+        return ranges[media_type]
+    wildcard = media_type.split("/")[0] + "/*"
+    if wildcard in ranges:
+        return ranges[wildcard]
+    return ranges.get("*/*", 0.0)
+
+
+def negotiate_format(accept: str | None, fast: bool) -> str:
+    """Pick "msgpack", "fast" or "json" for a list response"""
+    if msgpack is not None and accept:
+        ranges = parse_accept(accept)
+        # Only an explicit MessagePack range counts, */* alone keeps JSON
+        msgpack_quality = max(ranges.get(media_type, 0.0) for media_type in MSGPACK_ACCEPT_TYPES)
+        if msgpack_quality > 0 and msgpack_quality >= accept_quality(ranges, JSON_MEDIA_TYPE):
+            return "msgpack"
+    return "fast" if fast else "json"
+
+
+def encode_rows(keys: Sequence[str], rows: Iterable[Sequence], response_format: str) -> bytes:
+    """Encode Core result tuples as a list of objects without building models"""
+    payload = [dict(zip(keys, row)) for row in rows]
+    if response_format == "msgpack":
+        return encode_msgpack(payload)
+    return encode_json(payload)
+
+
+def media_type_for(response_format: str) -> str:
+    return MSGPACK_MEDIA_TYPE if response_format == "msgpack" else JSON_MEDIA_TYPE
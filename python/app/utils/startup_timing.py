@@ -0,0 +1,112 @@
+from contextlib import contextmanager
+import builtins
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Import heavy modules and start report workers ahead of the first request
+PRELOAD_HEAVY_MODULES = os.getenv("PRELOAD_HEAVY_MODULES", "1") == "1"
+
+
+class StartupTimer:
+    """Records how long each import and initialisation step of startup takes"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready_at: float | None = None
+        self.phases: list[dict] = []
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, kind: str, elapsed: float, modules_loaded: int, depth: int = 0):
+        with self._lock:
+            self.phases.append({
+                "name": name,
+                "kind": kind,
+                "seconds": round(elapsed, 4),
+                "modules_loaded": modules_loaded,
+                "depth": depth
+            })
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "import"):
+        """Time a block, counting the modules it pulled into sys.modules"""
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, kind, time.perf_counter() - start, len(sys.modules) - modules_before)
+
+    @contextmanager
+    def track_imports(self, packages: set[str]):
+        """Record the first import of every module from the given packages"""
+        # Times include nested imports, like python -X importtime, and depth
+        # tells those apart from the imports that triggered them
+        original_import = builtins.__import__
+        depth = 0
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            nonlocal depth
+            full_name = name
+            if level:
+                package = (globals or {}).get("__package__") or ""
+                full_name = importlib.util.resolve_name("." * level + name, package)
+            if full_name in sys.modules or full_name.split(".")[0] not in packages:
+                return original_import(name, globals, locals, fromlist, level)
+
+            modules_before = len(sys.modules)
+            start = time.perf_counter()
+            depth += 1
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                depth -= 1
+                self._record(full_name, "import", time.perf_counter() - start, len(sys.modules) - modules_before, depth)
+
+        builtins.__import__ = timed_import
+        try:
+            yield
+        finally:
+            builtins.__import__ = original_import
+
+    def import_module(self, name: str, kind: str = "warmup"):
+        """Import a module and record the time it took"""
+        with self.phase(name, kind):
+            importlib.import_module(name)
+
+    def warm_up_in_background(self, module_names: list[str]) -> threading.Thread:
+        """Import heavy modules on a background thread once the server is up"""
+        def warm():
+            for name in module_names:
+                try:
+                    self.import_module(name)
+                except ImportError as e:
+                    logger.warning(f"Could not preload {name}: {e}")
+
+        thread = threading.Thread(target=warm, name="import-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+        logger.info(f"Startup finished in {self.ready_at - self.started_at:.3f}s")
+        for phase in self.phases:
+            if phase["depth"] == 0:
+                logger.info(f"  {phase['kind']:<8} {phase['name']:<32} {phase['seconds']:.3f}s")
+
+    def report(self) -> dict:
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            "time_to_ready_seconds": None if self.ready_at is None else round(self.ready_at - self.started_at, 4),
+            "phases": sorted(phases, key=lambda phase: phase["seconds"], reverse=True)
+        }
+
+
+startup_timer = StartupTimer()
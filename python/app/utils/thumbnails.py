@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from PIL import Image
+import logging
+import os
+import uuid
+from .image_store import IMAGE_VARIANTS, image_store, is_content_hash
+
+logger = logging.getLogger(__name__)
+
+# Pixel size of images embedded in reports, the same as the image store's variant
+REPORT_IMAGE_SIZE = IMAGE_VARIANTS["report"]
+REPORT_IMAGE_QUALITY = int(os.getenv("REPORT_IMAGE_QUALITY", "75"))
+# Caps the number of images per report so the PDF size stays bounded
+REPORT_MAX_IMAGES = int(os.getenv("REPORT_MAX_IMAGES", "24"))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "4"))
+
+# Thumbnails of images given by path are cached in this directory next to
+# the originals, image store images use its "report" variant instead
+THUMBNAIL_DIR_NAME = ".report_thumbs"
+
+
+def thumbnail_path_for(image_path: str | Path, size: tuple[int, int] = REPORT_IMAGE_SIZE) -> Path:
+    """Location of the cached thumbnail for an image"""
+    source = Path(image_path)
+    width, height = size
+    # Keep the suffix so cow1.jpg and cow1.png get separate thumbnails
+    return source.parent / THUMBNAIL_DIR_NAME / f"{source.name}_{width}x{height}.jpg"
+
+
+def make_thumbnail(
+    image_path: str | Path,
+    size: tuple[int, int] = REPORT_IMAGE_SIZE,
+    quality: int = REPORT_IMAGE_QUALITY
+) -> str | None:
+    """Return a copy of an image scaled to fit within size, or None if it is missing"""
+    source = Path(image_path)
+    try:
+        source_mtime = source.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    thumbnail = thumbnail_path_for(source, size)
+    try:
+        if thumbnail.stat().st_mtime >= source_mtime:
+            return str(thumbnail)
+    except FileNotFoundError:
+        pass
+
+    try:
+        with Image.open(source) as img:
+            # Let the JPEG decoder downscale while decoding
+            img.draft("RGB", size)
+            resized = img.convert("RGB")
+            resized.thumbnail(size, Image.Resampling.LANCZOS)
+
+        thumbnail.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = thumbnail.with_name(f"{thumbnail.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            resized.save(tmp_path, "JPEG", quality=quality, optimize=True)
+            os.replace(tmp_path, thumbnail)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not create thumbnail for {source}: {e}")
+        # Embed the original rather than fail the whole report
+        return str(source)
+
+    return str(thumbnail)
+
+
+def report_thumbnail(image: str) -> str | None:
+    """Report-resolution copy of an image path or image store content hash, or None if it is missing"""
+    if not is_content_hash(image):
+        return make_thumbnail(image)
+    if not image_store.exists(image):
+        return None
+
+    try:
+        return str(image_store.variant_file(image, "report"))
+    except OSError as e:
+        logger.warning(f"Could not create report variant for image {image}: {e}")
+        return str(image_store.path_for(image))
+
+
+def make_report_thumbnails(images: list[str]) -> list[str]:
+    """Create thumbnails for several images in parallel, skipping missing ones"""
+    if not images:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(THUMBNAIL_WORKERS, len(images))) as executor:
+        thumbnails = executor.map(report_thumbnail, images)
+        return [thumbnail for thumbnail in thumbnails if thumbnail is not None]
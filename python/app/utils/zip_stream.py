@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import Iterator
+import io
+import time
+import zipfile
+
+# Size of the pieces a file is copied into the archive in
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+class ZipStreamBuffer(io.RawIOBase):
+    """Write-only sink for zipfile.ZipFile whose output can be sent as it is produced"""
+
+    # Being unseekable makes zipfile write data descriptors instead of
+    # patching headers already written, so drained bytes are never revisited
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def write_file_entry(archive: zipfile.ZipFile, buffer: ZipStreamBuffer, path: Path, arcname: str) -> Iterator[bytes]:
+    """Add a file to a streaming archive, yielding output as it is produced"""
+    with open(path, "rb") as source:
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime(path.stat().st_mtime)[:6])
+        info.file_size = path.stat().st_size
+        info.compress_type = archive.compression
+        with archive.open(info, "w") as entry:
+            while True:
+                chunk = source.read(ZIP_CHUNK_SIZE)
+                if not chunk:
+                    break
+                entry.write(chunk)
+                yield buffer.drain()
+    yield buffer.drain()
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the Antemortem Inspection Application backend
+
+Run everything from the python directory with ``python -m benchmarks.run``
+and compare two results files with ``python -m benchmarks.compare``.
+"""
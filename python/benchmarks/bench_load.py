@@ -0,0 +1,231 @@
+"""End-to-end load scenarios against a local server.
+
+Starts ``benchmarks.server`` in a subprocess with a synthetic camera and
+a generated database, then drives it over HTTP and WebSockets:
+
+- ``crud``: concurrent clients creating, reading, updating and listing inspections
+- ``stream``: N viewers of one camera stream
+- ``detection``: bursts of concurrent image uploads to /api/detection/process
+
+Run from the python directory:
+
+    python -m benchmarks.bench_load --scenarios crud stream detection --output load.json
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from .common import PROJECT_DIR, summarize, write_results, print_results
+from .data_generator import generate_database, make_jpeg
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def running_server(workdir: Path, camera_fps: float, camera_resolution: str, startup_timeout: float = 30.0):
+    """Run the benchmark server in a subprocess and yield its base URL"""
+    import httpx
+
+    port = free_port()
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_DIR)}
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.server",
+            "--port", str(port),
+            "--database-url", f"sqlite+aiosqlite:///{workdir / 'bench.db'}",
+            "--camera-fps", str(camera_fps),
+            "--camera-resolution", camera_resolution
+        ],
+        cwd=workdir,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Benchmark server exited with code {process.returncode}")
+            try:
+                httpx.get(f"{base_url}/", timeout=1.0)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Benchmark server did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+async def timed(timings: list, coro):
+    start = time.perf_counter()
+    response = await coro
+    timings.append(time.perf_counter() - start)
+    response.raise_for_status()
+    return response
+
+async def crud_scenario(base_url: str, clients: int, iterations: int) -> list[dict]:
+    """Each client repeatedly creates, reads, updates and lists inspections"""
+    import httpx
+
+    timings = {"create": [], "get": [], "update": [], "list": []}
+
+    async def client_loop(client: httpx.AsyncClient, client_id: int):
+        for i in range(iterations):
+            response = await timed(timings["create"], client.post(
+                "/api/inspection/", json={"inspector_id": f"bench_{client_id}", "animal_id": f"animal_{i}"}
+            ))
+            inspection_id = response.json()["id"]
+            await timed(timings["get"], client.get(f"/api/inspection/{inspection_id}"))
+            await timed(timings["update"], client.put(f"/api/inspection/{inspection_id}", json={"notes": f"pass {i}"}))
+            await timed(timings["list"], client.get("/api/inspection/", params={"skip": i * 10, "limit": 50}))
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, n) for n in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    total = sum(len(values) for values in timings.values())
+    return [
+        summarize(f"load.crud.{operation}", values, clients=clients, requests_per_sec=round(total / elapsed, 1))
+        for operation, values in timings.items()
+    ]
+
+async def stream_scenario(base_url: str, viewers: int, duration: float) -> list[dict]:
+    """Viewers of one camera stream, measuring the gap between frames"""
+    import httpx
+    import websockets
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post(
+            "/api/camera/configure/0",
+            json={"resolution": "1280x720", "framerate": 30, "settings": {}}
+        )
+        response.raise_for_status()
+
+    ws_url = base_url.replace("http://", "ws://") + "/api/camera/stream/0"
+    intervals = []
+    frame_counts = []
+
+    async def viewer(stop_at: float):
+        frames = 0
+        async with websockets.connect(ws_url, max_size=None, close_timeout=1) as websocket:
+            last = time.perf_counter()
+            while time.perf_counter() < stop_at:
+                try:
+                    await asyncio.wait_for(websocket.recv(), timeout=max(0.01, stop_at - time.perf_counter()))
+                except asyncio.TimeoutError:
+                    break
+                now = time.perf_counter()
+                if frames:
+                    intervals.append(now - last)
+                last = now
+                frames += 1
+        frame_counts.append(frames)
+
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(viewer(stop_at) for _ in range(viewers)))
+
+    if not intervals:
+        raise RuntimeError("No frames were received from the stream")
+    return [summarize(
+        f"load.stream.{viewers}_viewers.frame_interval",
+        intervals,
+        viewers=viewers,
+        fps_per_viewer=round(sum(frame_counts) / len(frame_counts) / duration, 2),
+        total_fps=round(sum(frame_counts) / duration, 2)
+    )]
+
+async def detection_scenario(base_url: str, burst_size: int, bursts: int) -> list[dict]:
+    """Bursts of concurrent uploads to the detection endpoint"""
+    import httpx
+
+    image = make_jpeg(1280, 720)
+    timings = []
+    limits = httpx.Limits(max_connections=burst_size)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        response = await client.post("/api/inspection/", json={"inspector_id": "bench", "animal_id": "detection"})
+        response.raise_for_status()
+        inspection_id = response.json()["id"]
+
+        start = time.perf_counter()
+        for _ in range(bursts):
+            await asyncio.gather(*(
+                timed(timings, client.post(
+                    "/api/detection/process",
+                    params={"inspection_id": inspection_id},
+                    files={"file": ("frame.jpg", image, "image/jpeg")}
+                ))
+                for _ in range(burst_size)
+            ))
+        elapsed = time.perf_counter() - start
+
+    return [summarize(
+        f"load.detection.burst_{burst_size}",
+        timings,
+        burst_size=burst_size,
+        images_per_sec=round(len(timings) / elapsed, 1)
+    )]
+
+async def run_scenarios(base_url: str, args) -> list[dict]:
+    results = []
+    if "crud" in args.scenarios:
+        results.extend(await crud_scenario(base_url, args.clients, args.iterations))
+    if "stream" in args.scenarios:
+        for viewers in args.viewers:
+            results.extend(await stream_scenario(base_url, viewers, args.duration))
+    if "detection" in args.scenarios:
+        results.extend(await detection_scenario(base_url, args.burst_size, args.bursts))
+    return results
+
+def run_benchmarks(args) -> list[dict]:
+    with tempfile.TemporaryDirectory(prefix="bench_load_") as workdir:
+        workdir = Path(workdir)
+        asyncio.run(generate_database(
+            f"sqlite+aiosqlite:///{workdir / 'bench.db'}",
+            args.inspections, args.detections, args.images, workdir / "data" / "images"
+        ))
+        with running_server(workdir, args.camera_fps, args.camera_resolution) as base_url:
+            return asyncio.run(run_scenarios(base_url, args))
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--scenarios", nargs="+", default=["crud", "stream", "detection"], choices=["crud", "stream", "detection"])
+    parser.add_argument("--inspections", type=int, default=1000, help="Inspections generated before the run")
+    parser.add_argument("--detections", type=int, default=5, help="Detections per generated inspection")
+    parser.add_argument("--images", type=int, default=2, help="Images per generated inspection")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent CRUD clients")
+    parser.add_argument("--iterations", type=int, default=25, help="CRUD cycles per client")
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 4, 16], help="Stream viewer counts to run")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds each stream run lasts")
+    parser.add_argument("--camera-fps", type=float, default=30.0)
+    parser.add_argument("--camera-resolution", default="1280x720")
+    parser.add_argument("--burst-size", type=int, default=16, help="Concurrent uploads per burst")
+    parser.add_argument("--bursts", type=int, default=5)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+    print_results(results)
+
+    if args.output:
+        params = {key: value for key, value in vars(args).items() if key != "output"}
+        write_results(args.output, results, params)
+
+if __name__ == "__main__":
+    main()
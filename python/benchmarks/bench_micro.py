@@ -0,0 +1,126 @@
+"""Micro-benchmarks for PDF rendering, image decode and JPEG encode.
+
+Run from the python directory:
+
+    python -m benchmarks.bench_micro --output micro.json
+"""
+from pathlib import Path
+import argparse
+import shutil
+import tempfile
+from .common import measure, summarize, write_results, print_results
+from .data_generator import make_frame, make_jpeg, make_month_data, write_image_pool
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+def bench_pdf(workdir: Path, repeat: int, monthly_rows: list[int]) -> list[dict]:
+    """Inspection reports with images and monthly reports of several sizes"""
+    from app.utils import thumbnails
+    from app.utils.pdf_generator import PDFGenerator
+
+    generator = PDFGenerator()
+    output_path = str(workdir / "report.pdf")
+    image_paths = [str(path) for path in write_image_pool(workdir / "images", 6)]
+    inspection_data = {
+        "id": "bench",
+        "date": "2024-03-01",
+        "inspector": "Bench",
+        "animal_type": "Cattle",
+        "health_status": "Passed",
+        "observations": "Synthetic observations",
+        "images": image_paths
+    }
+    thumbnail_dir = workdir / "images" / thumbnails.THUMBNAIL_DIR_NAME
+
+    def render_cold():
+        shutil.rmtree(thumbnail_dir, ignore_errors=True)
+        generator.generate_inspection_report(inspection_data, output_path)
+
+    results = [
+        summarize(
+            "pdf.inspection_report_cold_thumbnails",
+            measure(render_cold, repeat),
+            images=len(image_paths)
+        ),
+        summarize(
+            "pdf.inspection_report",
+            measure(lambda: generator.generate_inspection_report(inspection_data, output_path), repeat),
+            images=len(image_paths)
+        )
+    ]
+    for rows in monthly_rows:
+        month_data = make_month_data(rows)
+        results.append(summarize(
+            f"pdf.monthly_report.{rows}_rows",
+            measure(lambda: generator.generate_monthly_report(month_data, output_path), repeat),
+            rows=rows
+        ))
+    return results
+
+def bench_image_decode(repeat: int) -> list[dict]:
+    """Decoding uploaded JPEGs with OpenCV and Pillow"""
+    import cv2
+    import io
+    import numpy as np
+    from PIL import Image
+
+    results = []
+    for width, height in RESOLUTIONS:
+        data = make_jpeg(width, height)
+
+        def decode_cv2():
+            cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+        def decode_pil():
+            with Image.open(io.BytesIO(data)) as img:
+                img.load()
+
+        def decode_pil_draft():
+            # The thumbnail path decodes at reduced scale
+            with Image.open(io.BytesIO(data)) as img:
+                img.draft("RGB", (width // 4, height // 4))
+                img.load()
+
+        params = {"width": width, "height": height, "bytes": len(data)}
+        results.append(summarize(f"image_decode.cv2.{width}x{height}", measure(decode_cv2, repeat), **params))
+        results.append(summarize(f"image_decode.pil.{width}x{height}", measure(decode_pil, repeat), **params))
+        results.append(summarize(f"image_decode.pil_draft.{width}x{height}", measure(decode_pil_draft, repeat), **params))
+    return results
+
+def bench_jpeg_encode(repeat: int) -> list[dict]:
+    """Encoding camera frames the way get_frame does"""
+    import cv2
+
+    results = []
+    for width, height in RESOLUTIONS:
+        frame = make_frame(width, height)
+        size = len(cv2.imencode(".jpg", frame)[1])
+        results.append(summarize(
+            f"jpeg_encode.cv2.{width}x{height}",
+            measure(lambda: cv2.imencode(".jpg", frame), repeat),
+            width=width, height=height, bytes=size
+        ))
+    return results
+
+def run_benchmarks(repeat: int, monthly_rows: list[int]) -> list[dict]:
+    with tempfile.TemporaryDirectory(prefix="bench_micro_") as workdir:
+        results = bench_pdf(Path(workdir), max(1, repeat // 4), monthly_rows)
+    results.extend(bench_image_decode(repeat))
+    results.extend(bench_jpeg_encode(repeat))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--monthly-rows", type=int, nargs="+", default=[100, 2000])
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.repeat, args.monthly_rows)
+    print_results(results)
+
+    if args.output:
+        write_results(args.output, results, {"repeat": args.repeat, "monthly_rows": args.monthly_rows})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the list serialization paths for detections.
+
+Run from the python directory:
+
+    python -m benchmarks.bench_serialization --rows 5000
+"""
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import argparse
+import asyncio
+import json
+import time
+from app.models.database import Base, Inspection, Detection
+from app.routers.detection import DetectionResponse, detection_list_adapter, DETECTION_FIELDS
+from app.utils.serialization import encode_rows
+from .common import summarize, write_results, print_results
+
+async def seed(session: AsyncSession, rows: int):
+    """Create one inspection with the given number of detections"""
+    inspection = Inspection(inspector_id="bench", animal_id="bench", status="in_progress")
+    session.add(inspection)
+    await session.flush()
+    session.add_all([
+        Detection(
+            inspection_id=inspection.id,
+            lesion_type="sample_lesion",
+            confidence_score=0.5 + (i % 50) / 100,
+            location_data={"x": i % 640, "y": i % 480, "width": 50, "height": 50, "region": "flank"},
+            verified=bool(i % 2),
+            verified_by="bench" if i % 2 else None
+        )
+        for i in range(rows)
+    ])
+    await session.commit()
+    return inspection.id
+
+async def fastapi_default(session, inspection_id):
+    """ORM rows validated one by one and encoded with jsonable_encoder and json"""
+    result = await session.execute(select(Detection).where(Detection.inspection_id == inspection_id))
+    models = [DetectionResponse.model_validate(row) for row in result.scalars().all()]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+async def type_adapter(session, inspection_id):
+    """ORM rows encoded through a Pydantic TypeAdapter, the default list path"""
+    result = await session.execute(select(Detection).where(Detection.inspection_id == inspection_id))
+    detections = detection_list_adapter.validate_python(result.scalars().all(), from_attributes=True)
+    return detection_list_adapter.dump_json(detections)
+
+def core_path(response_format):
+    async def run(session, inspection_id):
+        columns = [Detection.__table__.c[field] for field in DETECTION_FIELDS]
+        result = await session.execute(select(*columns).where(Detection.inspection_id == inspection_id))
+        return encode_rows(DETECTION_FIELDS, result, response_format)
+    run.__doc__ = f"Core result tuples encoded as {response_format}"
+    return run
+
+SCENARIOS = {
+    "fastapi_default": fastapi_default,
+    "type_adapter": type_adapter,
+    "core_fast_json": core_path("fast"),
+    "core_msgpack": core_path("msgpack"),
+}
+
+async def run_benchmarks(rows: int, repeat: int) -> list[dict]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    results = []
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        inspection_id = await seed(session, rows)
+        for name, scenario in SCENARIOS.items():
+            timings = []
+            size = 0
+            for _ in range(repeat):
+                session.expunge_all()
+                start = time.perf_counter()
+                body = await scenario(session, inspection_id)
+                timings.append(time.perf_counter() - start)
+                size = len(body)
+            results.append(summarize(f"serialize_detections.{name}", timings, rows=rows, bytes=size))
+
+    await engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.rows, args.repeat))
+    print_results(results)
+
+    if args.output:
+        write_results(args.output, results, {"rows": args.rows, "repeat": args.repeat})
+
+if __name__ == "__main__":
+    main()
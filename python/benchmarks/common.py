@@ -0,0 +1,95 @@
+"""Timing, result and environment helpers shared by the benchmark suites"""
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Directory holding the python package, benchmarks run from here
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = PROJECT_DIR / "benchmarks" / "results"
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(name: str, timings: list[float], **extra) -> dict:
+    """Result record from timings in seconds, compared between runs on median_ms"""
+    return {
+        "name": name,
+        "samples": len(timings),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        **extra
+    }
+
+def measure(fn, repeat: int, warmup: int = 1) -> list[float]:
+    """Time repeated calls of a function after some untimed warm-up calls"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def git_dirty() -> bool:
+    try:
+        output = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return bool(output.strip())
+
+def environment() -> dict:
+    """Describe the machine and code version the results came from"""
+    return {
+        "commit": git_commit(),
+        "dirty": git_dirty(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+def write_results(path: Path, results: list[dict], params: dict | None = None) -> Path:
+    """Write results with their environment as a JSON document"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {"environment": environment(), "params": params or {}, "results": results}
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+def load_results(path: Path) -> dict:
+    """Read a results file, accepting a bare list of results as well"""
+    with open(path) as f:
+        document = json.load(f)
+    if isinstance(document, list):
+        document = {"environment": {}, "params": {}, "results": document}
+    return document
+
+def print_results(results: list[dict]):
+    for result in results:
+        print(f"{result['name']:<48} {result['median_ms']:>10.2f} ms  p95 {result['p95_ms']:>10.2f} ms")
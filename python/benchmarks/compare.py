@@ -0,0 +1,70 @@
+"""Compare two benchmark results files.
+
+Run from the python directory:
+
+    python -m benchmarks.compare benchmarks/results/<base>.json benchmarks/results/<head>.json
+
+Benchmarks are matched by name and compared on their median time. The
+exit status is 1 when any benchmark got slower than the threshold, so
+the comparison can gate a CI job.
+"""
+from pathlib import Path
+import argparse
+import sys
+from .common import load_results
+
+def compare(base: dict, head: dict, threshold: float) -> list[dict]:
+    """Median change per benchmark, in the order of the head results"""
+    base_results = {result["name"]: result for result in base["results"]}
+    rows = []
+    for result in head["results"]:
+        previous = base_results.get(result["name"])
+        if previous is None or not previous["median_ms"]:
+            rows.append({"name": result["name"], "base_ms": None, "head_ms": result["median_ms"], "change": None, "status": "new"})
+            continue
+        change = (result["median_ms"] - previous["median_ms"]) / previous["median_ms"]
+        if change > threshold:
+            status = "slower"
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = "same"
+        rows.append({
+            "name": result["name"],
+            "base_ms": previous["median_ms"],
+            "head_ms": result["median_ms"],
+            "change": change,
+            "status": status
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change treated as significant")
+    args = parser.parse_args()
+
+    base = load_results(args.base)
+    head = load_results(args.head)
+    for label, document in (("base", base), ("head", head)):
+        environment = document["environment"]
+        print(f"{label}: {environment.get('commit') or '?'} on {environment.get('platform') or '?'}")
+
+    rows = compare(base, head, args.threshold / 100)
+    for row in rows:
+        if row["change"] is None:
+            print(f"{row['name']:<48} {'':>10}    {row['head_ms']:>10.2f} ms  new")
+            continue
+        print(
+            f"{row['name']:<48} {row['base_ms']:>10.2f} -> {row['head_ms']:>10.2f} ms "
+            f"{row['change']:>+8.1%}  {row['status']}"
+        )
+
+    regressions = [row for row in rows if row["status"] == "slower"]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower by more than {args.threshold:g}%")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Fill a database with synthetic inspections, detections and images.
+
+Run from the python directory:
+
+    python -m benchmarks.data_generator --database-url sqlite+aiosqlite:///bench.db --inspections 1000
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import argparse
+import asyncio
+import json
+import random
+from app.models.database import Base, Inspection, Detection, Image
+
+LESION_TYPES = ["abscess", "bruise", "lameness", "skin_lesion", "swelling"]
+ANIMAL_TYPES = ["Cattle", "Pig", "Sheep", "Goat"]
+STATUSES = ["completed", "in_progress", "cancelled"]
+
+def make_frame(width: int, height: int, seed: int = 0):
+    """Synthetic BGR frame with gradients and noise, so JPEG sizes are realistic"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (x + y) / 2
+    frame[..., 1] = np.abs(x - y)
+    frame[..., 2] = (x * y / 255) % 256
+    noise = rng.integers(0, 32, size=(height, width, 3), dtype=np.uint8)
+    return frame + noise
+
+def make_jpeg(width: int, height: int, seed: int = 0, quality: int = 90) -> bytes:
+    import cv2
+
+    _, buffer = cv2.imencode(".jpg", make_frame(width, height, seed), [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+def write_image_pool(image_dir: Path, count: int, size: tuple[int, int] = (1280, 720)) -> list[Path]:
+    """Write a pool of distinct JPEG files that image rows point at"""
+    image_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = image_dir / f"synthetic_{size[0]}x{size[1]}_{i}.jpg"
+        if not path.exists():
+            path.write_bytes(make_jpeg(*size, seed=i))
+        paths.append(path)
+    return paths
+
+async def generate(
+    session: AsyncSession,
+    inspections: int,
+    detections_per_inspection: int = 5,
+    images_per_inspection: int = 2,
+    image_paths: list[Path] | None = None,
+    seed: int = 0,
+    batch_size: int = 500
+) -> dict:
+    """Insert synthetic rows in batches and return how many were created"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    counts = {"inspections": 0, "detections": 0, "images": 0}
+
+    for batch_start in range(0, inspections, batch_size):
+        batch = [
+            Inspection(
+                timestamp=start + timedelta(minutes=17 * i),
+                inspector_id=f"inspector_{rng.randrange(20)}",
+                animal_id=f"animal_{i}",
+                status=rng.choice(STATUSES),
+                notes=f"Synthetic inspection {i}"
+            )
+            for i in range(batch_start, min(inspections, batch_start + batch_size))
+        ]
+        session.add_all(batch)
+        await session.flush()
+
+        for inspection in batch:
+            images = [
+                Image(
+                    inspection_id=inspection.id,
+                    file_path=str(image_paths[rng.randrange(len(image_paths))]) if image_paths else f"missing_{inspection.id}_{n}.jpg",
+                    timestamp=inspection.timestamp,
+                    camera_id=str(n % 2),
+                    image_metadata={"resolution": "1280x720", "framerate": 30}
+                )
+                for n in range(images_per_inspection)
+            ]
+            session.add_all(images)
+            await session.flush()
+
+            session.add_all([
+                Detection(
+                    inspection_id=inspection.id,
+                    image_id=images[n % len(images)].id if images else None,
+                    timestamp=inspection.timestamp,
+                    lesion_type=rng.choice(LESION_TYPES),
+                    confidence_score=round(rng.uniform(0.5, 1.0), 3),
+                    location_data={
+                        "x": rng.randrange(1280), "y": rng.randrange(720),
+                        "width": rng.randrange(20, 200), "height": rng.randrange(20, 200)
+                    },
+                    verified=rng.random() < 0.5
+                )
+                for n in range(detections_per_inspection)
+            ])
+            counts["images"] += len(images)
+            counts["detections"] += detections_per_inspection
+
+        counts["inspections"] += len(batch)
+        await session.commit()
+
+    return counts
+
+def make_month_data(count: int, month: str = "2024-03") -> dict:
+    """Month data in the shape collect_month_data returns"""
+    year, month_number = map(int, month.split("-"))
+    return {
+        "month": month,
+        "total_inspections": count,
+        "passed_inspections": count,
+        "failed_inspections": 0,
+        "pending_actions": 0,
+        "inspections": [
+            {"date": f"{year}-{month_number:02d}-{i % 28 + 1:02d}", "id": str(i), "animal_type": "Pig", "status": "Passed"}
+            for i in range(count)
+        ]
+    }
+
+def write_report_data(
+    inspections_dir: Path,
+    count: int,
+    month: str = "2024-03",
+    image_paths: list[Path] | None = None,
+    images_per_inspection: int = 0,
+    seed: int = 0
+):
+    """Write inspection JSON files in the layout the report endpoints read"""
+    rng = random.Random(seed)
+    inspections_dir.mkdir(parents=True, exist_ok=True)
+    year, month_number = map(int, month.split("-"))
+    for i in range(count):
+        health_status = rng.choice(["Passed", "Passed", "Passed", "Failed"])
+        data = {
+            "id": str(i),
+            "date": f"{year}-{month_number:02d}-{i % 28 + 1:02d}",
+            "inspector": f"Inspector {rng.randrange(20)}",
+            "animal_type": rng.choice(ANIMAL_TYPES),
+            "health_status": health_status,
+            "status": health_status,
+            "observations": "Synthetic observations",
+            "requires_action": health_status == "Failed",
+            "images": [str(rng.choice(image_paths)) for _ in range(images_per_inspection)] if image_paths else []
+        }
+        with open(inspections_dir / f"inspection_{i}.json", "w") as f:
+            json.dump(data, f)
+
+async def generate_database(
+    database_url: str,
+    inspections: int,
+    detections: int,
+    images: int,
+    image_dir: Path | None = None,
+    unique_images: int = 16
+) -> dict:
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    image_paths = write_image_pool(image_dir, unique_images) if image_dir and images else None
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        counts = await generate(session, inspections, detections, images, image_paths)
+
+    await engine.dispose()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--inspections", type=int, default=1000)
+    parser.add_argument("--detections", type=int, default=5, help="Detections per inspection")
+    parser.add_argument("--images", type=int, default=2, help="Images per inspection")
+    parser.add_argument("--image-dir", type=Path, help="Write a pool of synthetic JPEGs here")
+    parser.add_argument("--unique-images", type=int, default=16, help="Size of the JPEG pool")
+    parser.add_argument("--report-data", type=Path, help="Also write inspection JSON files here")
+    args = parser.parse_args()
+
+    counts = asyncio.run(generate_database(
+        args.database_url, args.inspections, args.detections, args.images, args.image_dir, args.unique_images
+    ))
+    if args.report_data:
+        # The pool is already on disk, this only collects its paths
+        image_paths = write_image_pool(args.image_dir, args.unique_images) if args.image_dir else None
+        write_report_data(args.report_data, args.inspections, image_paths=image_paths, images_per_inspection=args.images)
+    print(json.dumps(counts))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Run the benchmark suites and write one results file.
+
+Run from the python directory:
+
+    python -m benchmarks.run                      # all suites
+    python -m benchmarks.run --suites micro serialization --quick
+
+Results go to benchmarks/results/<commit>.json unless --output is given.
+Compare two runs with ``python -m benchmarks.compare``.
+"""
+import argparse
+import asyncio
+from . import bench_load, bench_micro, bench_serialization
+from .common import RESULTS_DIR, git_commit, write_results, print_results
+
+SUITES = ["micro", "serialization", "load"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suites", nargs="+", default=SUITES, choices=SUITES)
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions for micro-benchmarks")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows for the serialization suite")
+    parser.add_argument("--output", help="Results file, defaults to benchmarks/results/<commit>.json")
+    bench_load.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.quick:
+        args.repeat, args.rows = 5, 500
+        args.inspections, args.clients, args.iterations = 100, 4, 5
+        args.viewers, args.duration = [1, 4], 2.0
+        args.burst_size, args.bursts = 4, 2
+    monthly_rows = [100] if args.quick else [100, 2000]
+
+    results = []
+    if "micro" in args.suites:
+        results.extend(bench_micro.run_benchmarks(args.repeat, monthly_rows))
+    if "serialization" in args.suites:
+        results.extend(asyncio.run(bench_serialization.run_benchmarks(args.rows, max(1, args.repeat // 4))))
+    if "load" in args.suites:
+        results.extend(bench_load.run_benchmarks(args))
+    print_results(results)
+
+    output = args.output or RESULTS_DIR / f"{(git_commit() or 'unknown')[:12]}.json"
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    print(f"Results written to {write_results(output, results, params)}")
+
+if __name__ == "__main__":
+    main()
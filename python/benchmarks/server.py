@@ -0,0 +1,69 @@
+"""Run the API with a synthetic camera for load benchmarks.
+
+Started by bench_load in a separate process, so the load generator does
+not share the server's event loop. Relative data paths resolve against
+the working directory, so run it from a scratch directory.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+class SyntheticCapture:
+    """Stand-in for cv2.VideoCapture whose read blocks until the next frame is due"""
+
+    fps = 30.0
+    resolution = (1280, 720)
+
+    def __init__(self, index):
+        from .data_generator import make_frame
+
+        self.frames = [make_frame(*self.resolution, seed=seed) for seed in range(8)]
+        self.count = 0
+        self.next_frame_at = time.perf_counter()
+
+    def set(self, prop, value):
+        return True
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        delay = self.next_frame_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame_at = max(self.next_frame_at + 1 / self.fps, time.perf_counter())
+        frame = self.frames[self.count % len(self.frames)]
+        self.count += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--camera-fps", type=float, default=30.0)
+    parser.add_argument("--camera-resolution", default="1280x720")
+    args = parser.parse_args()
+
+    # The engine reads DATABASE_URL when app.database is imported
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("PRELOAD_HEAVY_MODULES", "0")
+
+    import cv2
+    import uvicorn
+
+    SyntheticCapture.fps = args.camera_fps
+    SyntheticCapture.resolution = tuple(map(int, args.camera_resolution.split("x")))
+    cv2.VideoCapture = SyntheticCapture
+
+    from app.database import init_db
+    from app.main import app
+
+    asyncio.run(init_db())
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
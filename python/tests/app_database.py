@@ -0,0 +1,40 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.main import app
+from app.database import get_db
+from app.models.database import Base
+from app.routers import images
+from app.utils.image_store import ImageStore
+
+@asynccontextmanager
+async def app_database(db_path: Path | None = None, image_root: Path | None = None) -> AsyncIterator[AsyncEngine]:
+    """Database with the current schema, and optionally an image store, used by the app while open"""
+    if db_path is None:
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        # A file lets sessions on separate connections race each other
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def override_get_db():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    image_store = images.image_store
+    if image_root is not None:
+        images.image_store = ImageStore(image_root)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield engine
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        images.image_store = image_store
+        await engine.dispose()
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.models.database import Base, Detection, Image
+from benchmarks.compare import compare
+from benchmarks.data_generator import generate
+
+@pytest.mark.asyncio
+async def test_data_generator_counts():
+    """Test that the generator creates the requested rows"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        counts = await generate(session, 7, detections_per_inspection=3, images_per_inspection=2, batch_size=3)
+        assert counts == {"inspections": 7, "detections": 21, "images": 14}
+        assert await session.scalar(select(func.count()).select_from(Detection)) == 21
+        assert await session.scalar(select(func.count()).select_from(Image)) == 14
+
+    await engine.dispose()
+
+def test_compare_flags_regressions():
+    """Test that medians are compared by name against the threshold"""
+    base = {"results": [
+        {"name": "a", "median_ms": 10.0},
+        {"name": "b", "median_ms": 10.0},
+        {"name": "c", "median_ms": 10.0}
+    ]}
+    head = {"results": [
+        {"name": "a", "median_ms": 12.0},
+        {"name": "b", "median_ms": 10.5},
+        {"name": "c", "median_ms": 5.0},
+        {"name": "d", "median_ms": 1.0}
+    ]}
+
+    statuses = {row["name"]: row["status"] for row in compare(base, head, 0.1)}
+    assert statuses == {"a": "slower", "b": "same", "c": "faster", "d": "new"}
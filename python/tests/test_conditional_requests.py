@@ -0,0 +1,98 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.database import add_missing_columns
+from app.models.database import Base, Inspection
+from app_database import app_database
+
+# Test data
+test_inspection = {
+    "inspector_id": "test_inspector",
+    "animal_id": "test_animal",
+    "notes": "Test inspection"
+}
+
+@pytest.fixture
+async def test_engine():
+    async with app_database() as engine:
+        yield engine
+
+@pytest.fixture
+async def async_client(test_engine):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+async def test_db(test_engine):
+    async with AsyncSession(test_engine, expire_on_commit=False) as session:
+        yield session
+
+async def test_get_inspection_not_modified(async_client: AsyncClient, test_db: AsyncSession):
+    """Test that a current ETag gets a 304 and an update changes the ETag"""
+    inspection = Inspection(**test_inspection, status="in_progress")
+    test_db.add(inspection)
+    await test_db.commit()
+
+    response = await async_client.get(f"/api/inspection/{inspection.id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await async_client.get(
+        f"/api/inspection/{inspection.id}",
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    await async_client.put(f"/api/inspection/{inspection.id}", json={"notes": "Changed"})
+    response = await async_client.get(
+        f"/api/inspection/{inspection.id}",
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["notes"] == "Changed"
+
+async def test_list_inspections_not_modified(async_client: AsyncClient, test_db: AsyncSession):
+    """Test conditional GET on the inspection list"""
+    test_db.add(Inspection(**test_inspection, status="in_progress"))
+    await test_db.commit()
+
+    response = await async_client.get("/api/inspection/")
+    etag = response.headers["etag"]
+    assert response.headers["vary"] == "Accept"
+
+    response = await async_client.get("/api/inspection/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["vary"] == "Accept"
+
+    response = await async_client.get(
+        "/api/inspection/",
+        headers={"If-None-Match": etag, "Accept": "application/x-msgpack"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-msgpack"
+
+    test_db.add(Inspection(**test_inspection, status="in_progress"))
+    await test_db.commit()
+    response = await async_client.get("/api/inspection/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+def test_version_column_is_added_to_existing_databases():
+    """Test that the startup migration adds inspections.version with its default"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE inspections (id INTEGER PRIMARY KEY, timestamp DATETIME, "
+            "inspector_id VARCHAR, animal_id VARCHAR, status VARCHAR, notes VARCHAR)"
+        ))
+        conn.execute(text("INSERT INTO inspections (id, status) VALUES (1, 'in_progress')"))
+
+        Base.metadata.create_all(conn)
+        add_missing_columns(conn, Base.metadata)
+
+        assert "version" in {column["name"] for column in inspect(conn).get_columns("inspections")}
+        assert conn.execute(text("SELECT version FROM inspections WHERE id = 1")).scalar() == 1
@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from app.utils.connection_manager import ConnectionManager
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in that records what it was sent"""
+
+    def __init__(self, stalled=False):
+        self.sent = []
+        self.closed = False
+        self.stalled = stalled
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed = True
+
+@pytest.mark.asyncio
+async def test_broadcast_does_not_wait_for_stalled_client():
+    """Test that a stalled client does not delay delivery to the others"""
+    manager = ConnectionManager(queue_size=4, send_timeout=10)
+    healthy = FakeWebSocket()
+    stalled = FakeWebSocket(stalled=True)
+    await manager.connect(healthy)
+    await manager.connect(stalled)
+
+    await asyncio.wait_for(manager.broadcast({"event": "ping"}), timeout=0.1)
+    await asyncio.sleep(0.01)
+
+    assert healthy.sent == ['{"event": "ping"}']
+    manager.disconnect(healthy)
+    manager.disconnect(stalled)
+
+@pytest.mark.asyncio
+async def test_slow_consumer_drops_oldest_messages():
+    """Test that a full queue keeps only the newest messages"""
+    manager = ConnectionManager(queue_size=2, policy="drop_oldest", send_timeout=10)
+    stalled = FakeWebSocket(stalled=True)
+    await manager.connect(stalled)
+    await asyncio.sleep(0)
+
+    for i in range(5):
+        await manager.broadcast(str(i))
+
+    connection = manager.connections[stalled]
+    assert connection.dropped > 0
+    assert connection.queue.qsize() == 2
+    manager.disconnect(stalled)
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_disconnected():
+    """Test that the disconnect policy evicts a client with a full queue"""
+    manager = ConnectionManager(queue_size=1, policy="disconnect", send_timeout=10)
+    stalled = FakeWebSocket(stalled=True)
+    await manager.connect(stalled)
+    await asyncio.sleep(0)
+
+    for i in range(3):
+        await manager.broadcast(str(i))
+    await asyncio.sleep(0.01)
+
+    assert stalled not in manager.active_connections
+    assert stalled.closed
@@ -0,0 +1,50 @@
+import asyncio
+from app.utils.event_broker import BrokerClient, EventBroker
+from app.utils.events import EventBus
+
+async def wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+def test_events_are_numbered_once_for_all_workers(tmp_path):
+    """Test that every worker's bus sees the same globally numbered events"""
+    path = tmp_path / "events.sock"
+
+    async def run():
+        broker = EventBroker(history_size=10)
+        server = await asyncio.start_unix_server(broker.handle_worker, path=str(path))
+        buses, clients, broadcasts = [], [], []
+
+        async def on_broadcast(message):
+            broadcasts.append(message)
+
+        for _ in range(2):
+            bus, client = EventBus(), BrokerClient(str(path))
+            await client.start(on_event=bus.deliver, on_broadcast=on_broadcast)
+            bus.relay = client.publish
+            buses.append(bus)
+            clients.append(client)
+
+        assert buses[0].publish("inspection.created", {"id": 1}, inspection_id=1) is None
+        buses[1].publish("detection.created", {"id": 5}, inspection_id=1)
+        await wait_for(lambda: all(bus.seq == 2 for bus in buses))
+        assert [[event.type for event in bus.history] for bus in buses] == [["inspection.created", "detection.created"]] * 2
+        assert buses[0].history[0].timestamp == buses[1].history[0].timestamp
+
+        clients[0].broadcast("hello")
+        await wait_for(lambda: len(broadcasts) == 2)
+
+        # A worker started later catches up from the broker's history
+        late_bus, late_client = EventBus(), BrokerClient(str(path))
+        await late_client.start(on_event=late_bus.deliver, on_broadcast=on_broadcast)
+        await wait_for(lambda: late_bus.seq == 2)
+        assert [event.seq for event in late_bus.history] == [1, 2]
+
+        for client in clients + [late_client]:
+            await client.close()
+        server.close()
+
+    asyncio.run(run())
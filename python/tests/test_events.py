@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.utils.events import EventBus
+
+@pytest.mark.asyncio
+async def test_events_are_filtered_and_coalesced():
+    """Test that subscribers only get matching events, merged per entity"""
+    bus = EventBus()
+    batches = []
+
+    async def send(message):
+        batches.append(message)
+
+    subscription = bus.subscribe(send, topics={"detection"}, inspection_id=1)
+    subscription.interval = 0.01
+
+    bus.publish("detection.verified", {"id": 5, "verified": False}, inspection_id=1)
+    bus.publish("detection.verified", {"id": 5, "verified": True}, inspection_id=1)
+    bus.publish("detection.verified", {"id": 6, "verified": True}, inspection_id=2)
+    bus.publish("inspection.created", {"id": 1}, inspection_id=1)
+    await asyncio.sleep(0.05)
+
+    assert len(batches) == 1
+    events = batches[0]["events"]
+    assert [event["seq"] for event in events] == [2]
+    assert events[0]["data"]["verified"] is True
+    bus.unsubscribe(subscription)
+
+@pytest.mark.asyncio
+async def test_replay_after_reconnect():
+    """Test resuming from a sequence number and detecting history gaps"""
+    bus = EventBus(history_size=3)
+
+    async def send(message):
+        pass
+
+    subscription = bus.subscribe(send, topics={"inspection"})
+    for i in range(5):
+        bus.publish("inspection.updated", {"id": i}, inspection_id=i)
+
+    assert [event.seq for event in bus.replay(subscription, 3)] == [4, 5]
+    assert bus.replay(subscription, 5) == []
+    assert bus.replay(subscription, 0) is None
+    bus.unsubscribe(subscription)
+
+def test_invalid_subscription_gets_an_error_frame():
+    """Test that a malformed subscribe frame is rejected without closing the socket"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app).websocket_connect("/ws") as websocket:
+        websocket.send_json({"action": "subscribe", "topics": "inspection.updated"})
+        error = websocket.receive_json()
+        assert error["type"] == "error"
+        assert error["detail"][0]["loc"] == ["topics"]
+
+        websocket.send_json({"action": "subscribe", "topics": ["inspection"], "since": "yesterday"})
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_json({"action": "subscribe", "topics": ["inspection"], "inspection_id": 1})
+        assert websocket.receive_json()["type"] == "subscribed"
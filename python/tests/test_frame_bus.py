@@ -0,0 +1,141 @@
+import asyncio
+import numpy as np
+from app.utils import frame_bus
+from app.utils.frame_bus import CaptureClient, CaptureService, FrameRing
+
+class FakeCapture:
+    """Stand-in for cv2.VideoCapture producing numbered solid frames"""
+
+    def __init__(self):
+        self.count = 0
+        self.released = False
+
+    def read(self):
+        self.count += 1
+        return True, np.full((48, 64, 3), self.count % 256, np.uint8)
+
+    def release(self):
+        self.released = True
+
+def test_ring_reads_frames_in_place():
+    """Test that readers see the latest complete frame without copying it"""
+    ring = FrameRing.create(48 * 64 * 3, slots=3)
+    reader = FrameRing.attach(ring.name)
+    try:
+        assert reader.read(lambda frame: frame.copy()) is None
+
+        ring.write(np.full((48, 64, 3), 7, np.uint8))
+        number, _, (shape, value, owns_data) = reader.read(lambda frame: (frame.shape, int(frame[0, 0, 0]), frame.flags.owndata))
+        assert (number, shape, value, owns_data) == (1, (48, 64, 3), 7, False)
+        assert reader.read(lambda frame: None, after=number) is None
+
+        ring.write(np.full((48, 64), 9, np.uint8))
+        assert reader.read(lambda frame: (frame.shape, int(frame[0, 0])), after=number)[2] == ((48, 64), 9)
+    finally:
+        reader.close()
+        ring.close()
+
+def test_overtaken_reads_are_retried():
+    """Test that a frame overwritten while in use is never returned"""
+    ring = FrameRing.create(16, slots=2)
+    reader = FrameRing.attach(ring.name)
+    try:
+        ring.write(np.full((4, 4), 1, np.uint8))
+        attempts = []
+
+        def consume(frame):
+            value = int(frame[0, 0])
+            attempts.append(value)
+            if len(attempts) == 1:
+                # The writer laps the ring while the first read is in progress
+                for value_written in (2, 3):
+                    ring.write(np.full((4, 4), value_written, np.uint8))
+                return int(frame[0, 0])
+            return value
+
+        number, _, value = reader.read(consume)
+        assert attempts == [1, 3]
+        assert (number, value) == (3, 3)
+    finally:
+        reader.close()
+        ring.close()
+
+def test_capture_service_shares_cameras(tmp_path, monkeypatch):
+    """Test that workers share one capture, stopped when the last releases it"""
+    captures = []
+
+    def open_camera(camera_id, settings):
+        captures.append(FakeCapture())
+        return captures[-1]
+
+    monkeypatch.setattr(frame_bus, "open_camera", open_camera)
+    path = tmp_path / "frames.sock"
+
+    async def run():
+        service = CaptureService(slots=4)
+        server = await asyncio.start_unix_server(service.handle_worker, path=str(path))
+        first, second = CaptureClient(str(path)), CaptureClient(str(path))
+        settings = {"resolution": "64x48", "framerate": 30}
+
+        first_ring = await first.acquire("0", settings)
+        second_ring = await second.acquire("0", settings)
+        assert first_ring.name == second_ring.name
+        assert len(captures) == 1
+        assert first_ring.read(lambda frame: frame.shape)[2] == (48, 64, 3)
+
+        await first.release("0")
+        assert not captures[0].released
+
+        # A worker that goes away releases what it held
+        await second.close()
+        for _ in range(100):
+            if captures[0].released:
+                break
+            await asyncio.sleep(0.01)
+        assert captures[0].released and not service.cameras
+
+        first_ring.close()
+        second_ring.close()
+        await first.close()
+        server.close()
+
+    asyncio.run(run())
+
+def test_camera_runs_until_its_last_viewer_stops(tmp_path, monkeypatch):
+    """Test that one viewer stopping leaves the camera running for the others"""
+    from app.routers.camera import CameraManager
+
+    captures = []
+
+    def open_camera(camera_id, settings):
+        captures.append(FakeCapture())
+        return captures[-1]
+
+    monkeypatch.setattr(frame_bus, "open_camera", open_camera)
+    path = tmp_path / "frames.sock"
+
+    async def run():
+        service = CaptureService(slots=4)
+        server = await asyncio.start_unix_server(service.handle_worker, path=str(path))
+        manager = CameraManager(CaptureClient(str(path)))
+        settings = {"resolution": "64x48", "framerate": 30}
+
+        await manager.start_camera("0", settings)
+        await manager.start_camera("0", settings)
+        assert len(captures) == 1 and service.holders == {"0": 1}
+
+        await manager.stop_camera("0")
+        assert not captures[0].released
+        assert (await manager.get_frame("0")).startswith(b"\xff\xd8")
+
+        await manager.stop_camera("0")
+        for _ in range(100):
+            if captures[0].released:
+                break
+            await asyncio.sleep(0.01)
+        assert captures[0].released and "0" not in manager.active_cameras
+
+        await manager.close()
+        server.close()
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+import asyncio
+import io
+import pytest
+from PIL import Image
+from app.utils.image_store import ImageStore, ImageStoreError
+
+def create_jpeg(size=(800, 600), color=(120, 80, 60)):
+    """Encode a solid-colour JPEG in memory"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+def test_writes_are_deduplicated(tmp_path):
+    """Test that identical content is stored once under its hash"""
+    store = ImageStore(tmp_path)
+    data = create_jpeg()
+
+    first = store.write_bytes(data)
+    second = store.write_bytes(data)
+
+    assert first.created and not second.created
+    assert first.content_hash == second.content_hash
+    assert first.path == tmp_path / "objects" / first.content_hash[:2] / first.content_hash[2:4] / first.content_hash
+    assert first.path.read_bytes() == data
+    assert first.media_type == "image/jpeg"
+    assert store.resolve(first.content_hash) == str(first.path)
+    assert store.resolve("uploads/frame.jpg") == "uploads/frame.jpg"
+
+    with pytest.raises(ImageStoreError):
+        store.write_bytes(b"not an image")
+    with pytest.raises(ImageStoreError):
+        ImageStore(tmp_path, max_bytes=100).write_bytes(data)
+
+def test_variants_are_rendered_once(tmp_path):
+    """Test that a derived size is scaled down and reused"""
+    store = ImageStore(tmp_path, variants={"thumb": (200, 200)})
+    stored = store.write_bytes(create_jpeg())
+
+    async def render_concurrently():
+        return await asyncio.gather(*(store.variant_path(stored.content_hash, "thumb") for _ in range(3)))
+
+    paths = asyncio.run(render_concurrently())
+    assert len(set(paths)) == 1
+    with Image.open(paths[0]) as img:
+        assert img.size == (200, 150)
+
+    mtime = paths[0].stat().st_mtime_ns
+    assert asyncio.run(store.variant_path(stored.content_hash, "thumb")).stat().st_mtime_ns == mtime
@@ -0,0 +1,66 @@
+import asyncio
+import io
+import pytest
+from httpx import AsyncClient
+from PIL import Image as PILImage
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.models.database import Image, Inspection
+from app.routers import images
+from app_database import app_database
+
+def create_jpeg(size=(800, 600), color=(120, 80, 60)):
+    """Encode a solid-colour JPEG in memory"""
+    buffer = io.BytesIO()
+    PILImage.new("RGB", size, color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+@pytest.fixture
+async def test_engine(tmp_path):
+    async with app_database(tmp_path / "test.db", image_root=tmp_path / "images") as engine:
+        yield engine
+
+@pytest.fixture
+async def inspection_id(test_engine):
+    async with AsyncSession(test_engine, expire_on_commit=False) as session:
+        inspection = Inspection(inspector_id="test_inspector", animal_id="test_animal", status="in_progress")
+        session.add(inspection)
+        await session.commit()
+        return inspection.id
+
+async def test_concurrent_uploads_share_one_record(test_engine, inspection_id):
+    """Test that racing uploads of the same content end up with a single image row"""
+    stored = images.image_store.write_bytes(create_jpeg())
+
+    async def save():
+        async with AsyncSession(test_engine, expire_on_commit=False) as session:
+            return await images.save_image_record(session, inspection_id, stored)
+
+    first, second = await asyncio.gather(save(), save())
+    assert first.id == second.id
+
+    async with AsyncSession(test_engine) as session:
+        assert await session.scalar(select(func.count()).select_from(Image)) == 1
+
+async def test_image_range_and_head_requests(test_engine, inspection_id):
+    """Test that stored images are served with Range, HEAD and conditional support"""
+    content = create_jpeg()
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            f"/api/images/upload?inspection_id={inspection_id}",
+            files={"file": ("cow.jpg", content, "image/jpeg")}
+        )
+        url = response.json()["url"]
+
+        response = await client.get(url, headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == content[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(content)}"
+
+        response = await client.head(url)
+        assert response.headers["content-length"] == str(len(content))
+        assert response.content == b""
+
+        response = await client.get(url, headers={"If-None-Match": response.headers["etag"]})
+        assert response.status_code == 304
@@ -0,0 +1,45 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.utils.metrics import MetricsRegistry, MetricsMiddleware, HTTP_REQUESTS
+
+def test_histogram_renders_cumulative_buckets():
+    """Test Prometheus text output for labelled histograms"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("encode_seconds", "Encode time", ("camera_id",), (0.01, 0.1))
+    child = histogram.labels("0")
+    for value in (0.005, 0.05, 0.5):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE encode_seconds histogram" in lines
+    assert 'encode_seconds_bucket{camera_id="0",le="0.01"} 1' in lines
+    assert 'encode_seconds_bucket{camera_id="0",le="0.1"} 2' in lines
+    assert 'encode_seconds_bucket{camera_id="0",le="+Inf"} 3' in lines
+    assert 'encode_seconds_count{camera_id="0"} 3' in lines
+
+def test_counter_requires_declared_labels():
+    """Test that label values must match the declared label names"""
+    registry = MetricsRegistry()
+    counter = registry.counter("frames_total", "Frames", ("camera_id",))
+    counter.labels(1).inc(2)
+    assert 'frames_total{camera_id="1"} 2' in registry.render()
+    with pytest.raises(ValueError):
+        counter.labels("1", "extra")
+
+def test_middleware_labels_by_route_template():
+    """Test that path parameters do not create new series"""
+    async def item(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/items/{item_id}", item)])
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert HTTP_REQUESTS.labels("GET", "/items/{item_id}", 200).value == 2
+    assert HTTP_REQUESTS.labels("GET", "unmatched", 404).value == 1
@@ -0,0 +1,45 @@
+from app.utils import pdf_generator
+from app.utils.pdf_generator import PDFGenerator, _StreamedFlowables
+
+def create_month_data(count):
+    """Month data with the given number of inspections"""
+    return {
+        "month": "2024-03",
+        "total_inspections": count,
+        "passed_inspections": count,
+        "failed_inspections": 0,
+        "pending_actions": 0,
+        "inspections": [
+            {"date": "2024-03-01", "id": str(i), "animal_type": "Pig", "status": "Passed"}
+            for i in range(count)
+        ]
+    }
+
+def test_large_monthly_report(tmp_path, monkeypatch):
+    """Test that large-report mode renders every row across several pages"""
+    monkeypatch.setattr(pdf_generator, "LARGE_REPORT_ROWS", 10)
+    output_path = tmp_path / "monthly.pdf"
+
+    PDFGenerator().generate_monthly_report(create_month_data(200), str(output_path))
+
+    content = output_path.read_bytes()
+    assert content.startswith(b"%PDF")
+    assert content.count(b"/Type /Page\n") > 1
+
+def test_streamed_flowables_buffer_is_bounded():
+    """Test that streamed flowables are pulled from the source lazily"""
+    pulled = []
+
+    def source():
+        for i in range(100):
+            pulled.append(i)
+            yield i
+
+    flowables = _StreamedFlowables(["header"], source(), lookahead=4)
+    consumed = []
+    while len(flowables):
+        consumed.append(flowables[0])
+        del flowables[0]
+        assert len(pulled) - len(consumed) <= 4
+
+    assert consumed == ["header"] + list(range(100))
@@ -0,0 +1,63 @@
+import time
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.utils import admin_auth
+from app.utils.profiling import ProfileStore, RequestProfilingMiddleware, SamplingProfiler
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def create_client(tmp_path):
+    async def slow(request):
+        busy_loop(0.01)
+        return PlainTextResponse("done", status_code=201)
+
+    app = Starlette(routes=[Route("/slow", slow)])
+    store = ProfileStore(tmp_path, max_profiles=2)
+    app.add_middleware(RequestProfilingMiddleware, store=store)
+    return TestClient(app), store
+
+def test_request_profile_requires_admin_token(tmp_path, monkeypatch):
+    """Test that the profile header is ignored without a valid token"""
+    monkeypatch.setattr(admin_auth, "ADMIN_TOKEN", "secret")
+    client, store = create_client(tmp_path)
+
+    response = client.get("/slow", headers={"X-Profile": "return", "X-Admin-Token": "wrong"})
+    assert response.text == "done"
+    assert "x-profiled-status" not in response.headers
+
+    response = client.get("/slow", headers={"X-Profile": "return", "X-Admin-Token": "secret"})
+    assert response.headers["x-profiled-status"] == "201"
+    assert "busy_loop" in response.text
+
+def test_stored_profiles_are_bounded(tmp_path, monkeypatch):
+    """Test store mode keeps the response and only the newest profiles"""
+    monkeypatch.setattr(admin_auth, "ADMIN_TOKEN", "secret")
+    client, store = create_client(tmp_path)
+
+    ids = []
+    for _ in range(3):
+        response = client.get("/slow", headers={"X-Profile": "store", "X-Admin-Token": "secret"})
+        assert response.status_code == 201
+        ids.append(response.headers["x-profile-id"])
+
+    assert [profile["id"] for profile in store.list()] == ids[:0:-1]
+    assert not store.path_for(ids[0]).exists()
+    assert store.path_for(ids[2]).exists()
+
+def test_sampling_profiler_collapsed_stacks():
+    """Test that the sampled thread's hot function shows up in collapsed output"""
+    profiler = SamplingProfiler()
+    profiler.start(interval=0.001)
+    busy_loop(0.2)
+    profiler.stop()
+
+    lines = profiler.collapsed().splitlines()
+    assert profiler.status()["samples"] > 0
+    assert any("busy_loop" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
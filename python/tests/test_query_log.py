@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.utils.metrics import instrument_engine
+from app.utils.query_log import QueryLog, normalize_statement, parameter_shape
+
+def test_normalize_statement():
+    """Test that literals and IN-list lengths are folded together"""
+    assert normalize_statement("SELECT *  FROM t\n WHERE id IN (?, ?, ?) AND name = 'x' LIMIT 10") == \
+        "SELECT * FROM t WHERE id IN (?, ...) AND name = ? LIMIT ?"
+    assert parameter_shape((1, "abc", None)) == "(int, str[3], NoneType)"
+    assert parameter_shape([(1,), (2,)], executemany=True) == "2 x (int)"
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_explained():
+    """Test that slow statements get a query plan flagging full scans"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    query_log = QueryLog(threshold_ms=0)
+    instrument_engine(engine, on_statement=query_log.record)
+
+    metadata = MetaData()
+    items = Table("items", metadata, Column("id", Integer, primary_key=True), Column("group_id", Integer))
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(items), [{"group_id": i % 3} for i in range(10)])
+        for group_id in range(3):
+            await conn.execute(select(items).where(items.c.group_id == group_id))
+
+    stats = {entry["statement"]: entry for entry in query_log.top()}
+    scan = stats["SELECT items.id, items.group_id FROM items WHERE items.group_id = ?"]
+    assert scan["count"] == 3
+    assert scan["full_scan"] is True
+    assert any("items" in line for line in scan["plan"])
+    assert query_log.slow_queries[-1]["parameters"] == "(int)"
+    await engine.dispose()
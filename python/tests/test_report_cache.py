@@ -0,0 +1,103 @@
+import os
+from app.utils.report_cache import ReportCache
+from app.utils.http_cache import make_etag, etag_matches
+
+# Test data
+test_report_data = {
+    "id": "42",
+    "date": "2024-03-01",
+    "inspector": "test_inspector",
+    "animal_type": "Pig",
+    "health_status": "Passed"
+}
+
+def fake_render(calls):
+    """Render stub that records each call and writes a small file"""
+    def render(output_path):
+        calls.append(output_path)
+        with open(output_path, "wb") as f:
+            f.write(b"%PDF-1.4 test")
+    return render
+
+def test_unchanged_report_is_rendered_once(tmp_path):
+    """Test that a second request for the same data is served from disk"""
+    cache = ReportCache(tmp_path, template_version="1")
+    calls = []
+    key = cache.key_for(test_report_data)
+
+    first = cache.get_or_render("inspection_report_42", key, fake_render(calls))
+    second = cache.get_or_render("inspection_report_42", key, fake_render(calls))
+
+    assert first == second
+    assert first.exists()
+    assert len(calls) == 1
+
+def test_key_changes_with_data_and_template():
+    """Test that the cache key covers both the data and the template version"""
+    cache_v1 = ReportCache("unused", template_version="1")
+    cache_v2 = ReportCache("unused", template_version="2")
+    changed = {**test_report_data, "health_status": "Failed"}
+
+    assert cache_v1.key_for(test_report_data) == cache_v1.key_for(dict(test_report_data))
+    assert cache_v1.key_for(test_report_data) != cache_v1.key_for(changed)
+    assert cache_v1.key_for(test_report_data) != cache_v2.key_for(test_report_data)
+
+def test_key_changes_when_an_image_file_is_replaced(tmp_path):
+    """Test that replacing an embedded image produces a new cache key"""
+    cache = ReportCache(tmp_path, template_version="1")
+    image = tmp_path / "cow.jpg"
+    image.write_bytes(b"first")
+    data = {**test_report_data, "images": [str(image)]}
+    key = cache.key_for(data)
+
+    image.write_bytes(b"second image")
+    assert cache.key_for(data) != key
+
+def test_invalidate_removes_all_versions(tmp_path):
+    """Test that invalidating a report leaves other reports untouched"""
+    cache = ReportCache(tmp_path, template_version="1", min_age=0)
+    calls = []
+    report = cache.get_or_render("inspection_report_4", "a" * 64, fake_render(calls))
+    other = cache.get_or_render("inspection_report_42", "b" * 64, fake_render(calls))
+
+    cache.invalidate("inspection_report_4")
+
+    assert not report.exists()
+    assert other.exists()
+
+def test_eviction_keeps_cache_within_budget(tmp_path):
+    """Test that the least recently used reports are evicted first"""
+    cache = ReportCache(tmp_path, template_version="1", max_bytes=30)
+    calls = []
+    oldest = cache.get_or_render("report_1", "1" * 64, fake_render(calls))
+    os.utime(oldest, (0, 0))
+    newer = cache.get_or_render("report_2", "2" * 64, fake_render(calls))
+    newest = cache.get_or_render("report_3", "3" * 64, fake_render(calls))
+
+    assert not oldest.exists()
+    assert newer.exists()
+    assert newest.exists()
+
+def test_recently_used_reports_are_not_removed(tmp_path):
+    """Test that invalidation and eviction skip reports used within min_age"""
+    cache = ReportCache(tmp_path, template_version="1", max_bytes=0, min_age=60)
+    calls = []
+    report = cache.get_or_render("report_1", "1" * 64, fake_render(calls))
+
+    cache.get_or_render("report_2", "2" * 64, fake_render(calls))
+    cache.invalidate("report_1")
+    assert report.exists()
+
+    os.utime(report, (0, 0))
+    cache.evict()
+    assert not report.exists()
+
+def test_etag_matching():
+    """Test If-None-Match comparison rules"""
+    etag = make_etag("abc")
+
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from app.utils.report_cache import ReportCache
+from app.utils.report_jobs import ReportJobManager
+
+# Test data
+test_month_data = {
+    "month": "2024-03",
+    "total_inspections": 1,
+    "passed_inspections": 1,
+    "failed_inspections": 0,
+    "pending_actions": 0,
+    "inspections": [
+        {"date": "2024-03-01", "id": "1", "animal_type": "Pig", "status": "Passed"}
+    ]
+}
+
+@pytest.fixture
+def job_manager(tmp_path):
+    """Job manager rendering into a temporary reports directory"""
+    manager = ReportJobManager(ReportCache(tmp_path, template_version="test"), max_workers=1)
+    yield manager
+    manager.shutdown()
+
+@pytest.mark.asyncio
+async def test_duplicate_submissions_are_coalesced(job_manager):
+    """Test that identical pending reports share one job"""
+    first = job_manager.submit("monthly", "monthly_report_2024_03", test_month_data, "report.pdf")
+    second = job_manager.submit("monthly", "monthly_report_2024_03", dict(test_month_data), "report.pdf")
+    assert first is second
+
+    await first.done.wait()
+    assert first.status == "completed"
+    assert first.path.read_bytes().startswith(b"%PDF")
+
+@pytest.mark.asyncio
+async def test_cached_report_completes_immediately(job_manager):
+    """Test that a report already in the cache skips the worker pool"""
+    await job_manager.render("monthly", "monthly_report_2024_03", test_month_data, "report.pdf")
+
+    job = job_manager.submit("monthly", "monthly_report_2024_03", test_month_data, "report.pdf")
+    assert job.status == "completed"
+    assert job.done.is_set()
+
+@pytest.mark.asyncio
+async def test_failed_render_is_reported(job_manager):
+    """Test that a rendering error marks the job as failed"""
+    job = job_manager.submit("unknown", "bad_report", {}, "bad.pdf")
+    await job.done.wait()
+
+    assert job.status == "failed"
+    assert "Unknown report kind" in job.error
+
+@pytest.mark.asyncio
+async def test_job_waiting_for_a_worker_stays_queued(job_manager):
+    """Test that a job only reports running once a pool worker is free for it"""
+    other_month = {**test_month_data, "month": "2024-04"}
+    first = job_manager.submit("monthly", "monthly_report_2024_03", test_month_data, "march.pdf")
+    second = job_manager.submit("monthly", "monthly_report_2024_04", other_month, "april.pdf")
+    await asyncio.sleep(0)
+
+    assert first.status == "running"
+    assert second.status == "queued"
+
+    await second.done.wait()
+    assert second.status == "completed"
+
+@pytest.mark.asyncio
+async def test_only_polled_jobs_are_kept(job_manager):
+    """Test that inline renders are not kept, unless a submit joins them"""
+    rendering = asyncio.ensure_future(
+        job_manager.render("monthly", "monthly_report_2024_03", test_month_data, "report.pdf")
+    )
+    await asyncio.sleep(0)
+    assert job_manager.jobs == {}
+
+    job = job_manager.submit("monthly", "monthly_report_2024_03", test_month_data, "report.pdf")
+    assert job_manager.get(job.id) is job
+    assert await rendering is job
+
+    await job_manager.render("monthly", "monthly_report_2024_03", test_month_data, "report.pdf")
+    assert list(job_manager.jobs) == [job.id]
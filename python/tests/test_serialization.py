@@ -0,0 +1,42 @@
+from datetime import datetime
+import json
+import msgpack
+from app.utils.serialization import encode_rows, negotiate_format
+
+# Test data
+test_keys = ["id", "timestamp", "location_data", "verified_by"]
+test_rows = [
+    (1, datetime(2024, 3, 1, 8, 30), {"x": 100, "y": 100}, None),
+    (2, datetime(2024, 3, 1, 8, 31), {"x": 50, "y": 20}, "vet")
+]
+
+def test_encode_rows_as_json():
+    """Test that Core rows encode to the same shape as the response model"""
+    data = json.loads(encode_rows(test_keys, test_rows, "fast"))
+    assert data[0] == {
+        "id": 1,
+        "timestamp": "2024-03-01T08:30:00",
+        "location_data": {"x": 100, "y": 100},
+        "verified_by": None
+    }
+    assert data[1]["verified_by"] == "vet"
+
+def test_encode_rows_as_msgpack():
+    """Test MessagePack encoding of Core rows"""
+    data = msgpack.unpackb(encode_rows(test_keys, test_rows, "msgpack"))
+    assert data[1]["timestamp"] == "2024-03-01T08:31:00"
+    assert data[1]["location_data"] == {"x": 50, "y": 20}
+
+def test_negotiate_format():
+    """Test choosing between the model, fast JSON and MessagePack paths"""
+    assert negotiate_format(None, False) == "json"
+    assert negotiate_format("application/json", True) == "fast"
+    assert negotiate_format("application/x-msgpack", False) == "msgpack"
+
+def test_negotiate_format_honours_q_values():
+    """Test that Accept q-values decide between MessagePack and JSON"""
+    assert negotiate_format("application/msgpack;q=0", False) == "json"
+    assert negotiate_format("application/json, application/msgpack;q=0.5", False) == "json"
+    assert negotiate_format("application/json;q=0.5, application/msgpack", False) == "msgpack"
+    assert negotiate_format("*/*", True) == "fast"
+    assert negotiate_format("text/html, application/x-msgpack; q=0.9", False) == "msgpack"
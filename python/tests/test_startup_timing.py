@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+from app.utils.startup_timing import StartupTimer
+
+def test_phases_are_recorded(tmp_path, monkeypatch):
+    """Test that imports and init steps are timed with nested depths"""
+    package = tmp_path / "timing_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("from .child import VALUE\n")
+    (package / "child.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    timer = StartupTimer()
+    with timer.track_imports({"timing_pkg"}):
+        import timing_pkg  # noqa: F401
+    with timer.phase("database", kind="init"):
+        pass
+    timer.mark_ready()
+
+    report = timer.report()
+    phases = {phase["name"]: phase for phase in report["phases"]}
+    assert phases["timing_pkg"]["depth"] == 0
+    assert phases["timing_pkg.child"]["depth"] == 1
+    assert phases["timing_pkg"]["modules_loaded"] == 2
+    assert phases["database"]["kind"] == "init"
+    assert phases["database"]["depth"] == 0
+    assert report["time_to_ready_seconds"] >= 0
+    assert [phase["seconds"] for phase in report["phases"]] == sorted(
+        (phase["seconds"] for phase in report["phases"]), reverse=True
+    )
+
+def test_startup_timing_endpoint():
+    """Test that the endpoint reports the app's own import phases"""
+    from app.main import app
+
+    response = TestClient(app).get("/startup-timing")
+    assert response.status_code == 200
+    payload = response.json()
+    assert set(payload) == {"time_to_ready_seconds", "phases"}
+    names = {phase["name"] for phase in payload["phases"]}
+    assert "app.routers" in names
+    assert all(set(phase) == {"name", "kind", "seconds", "modules_loaded", "depth"} for phase in payload["phases"])
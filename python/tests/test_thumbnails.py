@@ -0,0 +1,62 @@
+from PIL import Image
+from app.utils import thumbnails
+from app.utils.image_store import ImageStore
+from app.utils.thumbnails import make_thumbnail, make_report_thumbnails, thumbnail_path_for
+
+def create_test_image(path, size=(1600, 1200)):
+    """Write a solid-colour JPEG to disk"""
+    Image.new("RGB", size, (120, 80, 60)).save(path, "JPEG")
+    return str(path)
+
+def test_thumbnail_is_scaled_and_cached(tmp_path):
+    """Test that thumbnails are written next to the original and reused"""
+    original = create_test_image(tmp_path / "frame.jpg")
+
+    thumbnail = make_thumbnail(original, size=(400, 300))
+    assert thumbnail == str(thumbnail_path_for(original, (400, 300)))
+    with Image.open(thumbnail) as img:
+        assert img.size == (400, 300)
+
+    mtime = (tmp_path / ".report_thumbs" / "frame.jpg_400x300.jpg").stat().st_mtime_ns
+    assert make_thumbnail(original, size=(400, 300)) == thumbnail
+    assert (tmp_path / ".report_thumbs" / "frame.jpg_400x300.jpg").stat().st_mtime_ns == mtime
+
+def test_missing_images_are_skipped(tmp_path):
+    """Test that batch thumbnailing keeps order and drops missing files"""
+    first = create_test_image(tmp_path / "a.jpg")
+    second = create_test_image(tmp_path / "b.jpg")
+
+    thumbnails = make_report_thumbnails([first, str(tmp_path / "missing.jpg"), second])
+
+    assert len(thumbnails) == 2
+    assert thumbnails[0].endswith("a.jpg_600x450.jpg")
+    assert thumbnails[1].endswith("b.jpg_600x450.jpg")
+
+def test_thumbnail_keeps_aspect_ratio(tmp_path):
+    """Test that wide images are scaled to fit the box without distortion"""
+    original = create_test_image(tmp_path / "wide.jpg", size=(1600, 400))
+
+    with Image.open(make_thumbnail(original, size=(400, 300))) as img:
+        assert img.size == (400, 100)
+
+def test_same_stem_gets_separate_thumbnails(tmp_path):
+    """Test that images differing only by suffix do not share a thumbnail"""
+    jpeg = create_test_image(tmp_path / "cow1.jpg")
+    png = tmp_path / "cow1.png"
+    Image.new("RGB", (800, 600), (0, 0, 0)).save(png, "PNG")
+
+    assert make_thumbnail(jpeg) != make_thumbnail(str(png))
+
+def test_stored_images_use_the_report_variant(tmp_path, monkeypatch):
+    """Test that content-hash images are thumbnailed by the image store, outside its objects"""
+    store = ImageStore(tmp_path / "images")
+    monkeypatch.setattr(thumbnails, "image_store", store)
+    create_test_image(tmp_path / "cow.jpg")
+    stored = store.write_bytes((tmp_path / "cow.jpg").read_bytes())
+
+    result = make_report_thumbnails([stored.content_hash, "f" * 64])
+
+    assert result == [str(store.variant_path_for(stored.content_hash, "report"))]
+    with Image.open(result[0]) as img:
+        assert img.size == (600, 450)
+    assert not list((tmp_path / "images" / "objects").rglob(".report_thumbs"))
@@ -0,0 +1,28 @@
+import io
+import zipfile
+from app.utils.zip_stream import ZipStreamBuffer, write_file_entry
+
+def test_streamed_archive_is_valid(tmp_path):
+    """Test that an archive assembled from drained chunks can be read back"""
+    files = {
+        "inspection_report_1.pdf": b"%PDF-1.4 first" * 1000,
+        "inspection_report_2.pdf": b"%PDF-1.4 second" * 10000
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_bytes(content)
+
+    buffer = ZipStreamBuffer()
+    chunks = []
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in files:
+            chunks.extend(write_file_entry(archive, buffer, tmp_path / name, name))
+    chunks.append(buffer.drain())
+
+    # Output must arrive incrementally rather than all at the end
+    assert len([chunk for chunk in chunks if chunk]) > 2
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in archive.infolist())
+        for name, content in files.items():
+            assert archive.read(name) == content